@@ -7,11 +7,16 @@ https://github.com/ambientika/HomeAssistant-integration-for-Ambientika
 from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_USERNAME, Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .const import DATA_VALIDATED_CLIENTS, DOMAIN, TOPOLOGY_REFRESH_INTERVAL
 from .hub import AmbientikaHub
+from .services import async_setup_services
+from .topology import TopologyCache
 
 PLATFORMS: list[Platform] = [
     Platform.BUTTON,
@@ -20,22 +25,51 @@ PLATFORMS: list[Platform] = [
     Platform.SENSOR,
 ]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the services, they are shared by all entries."""
+    async_setup_services(hass)
+    return True
+
 
-# TODO: can we reduce the frequency of api calls for bad devices?
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up this integration using UI."""
     hass.data.setdefault(DOMAIN, {})
 
-    hub = AmbientikaHub(hass=hass, config=entry.data)
-    await hub.login()
+    # Reuse the session the config flow has just validated instead of authenticating again.
+    client = hass.data.get(DATA_VALIDATED_CLIENTS, {}).pop(
+        entry.data.get(CONF_USERNAME), None
+    )
+    hub = AmbientikaHub(
+        hass=hass, config=entry.data, options=entry.options, client=client
+    )
     hass.data[DOMAIN][entry.entry_id] = hub
 
+    # With the devices of the last run, the platforms are set up right away and the devices are fetched in the
+    # background. Otherwise the first refresh seeds `hub.devices`, the platforms are set up from it.
     # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await hub.async_config_entry_first_refresh()
+    if await hub.async_restore_topology():
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        entry.async_create_background_task(
+            hass, hub.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
+        await hub.async_config_entry_first_refresh()
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            hub.async_scheduled_refresh_topology,
+            TOPOLOGY_REFRESH_INTERVAL,
+            name=f"{DOMAIN} topology refresh",
+            cancel_on_shutdown=True,
+        )
+    )
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
 
     return True
 
@@ -47,7 +81,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unloaded
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached devices of a removed entry."""
+    await TopologyCache(hass, entry.entry_id).async_remove()
+
+
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running hub, reload only if the credentials changed."""
+    hub: AmbientikaHub = hass.data[DOMAIN][entry.entry_id]
+    if hub.uses_credentials(entry.data):
+        hub.async_update_options(entry.options)
+    else:
+        async_reload_entry(hass, entry)
+
+
+@callback
+def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload config entry.
+
+    The reload is scheduled, so it runs in the setup context with the unload callbacks of the entry.
+    """
+    hass.config_entries.async_schedule_reload(entry.entry_id)
@@ -4,13 +4,49 @@ This uses https://pypi.org/project/ambientika/ as a facade.
 Ambientika API: https://app.ambientika.eu:4521/swagger/index.html.
 """
 
-from returns.result import Failure
+import asyncio
+import base64
+import json
+import time
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Any
+
+import aiohttp
+from returns.result import Failure, Result, Success
 from returns.primitives.exceptions import UnwrapFailedError
 
 
-from ambientika_py import authenticate, Device
+from ambientika_py import (
+    Ambientika,
+    AmbientikaApi,
+    HttpError,
+    Device,
+    House,
+    parse_response_body,
+)
 
-from .const import DEFAULT_HOST, LOGGER
+from .circuit_breaker import CircuitBreaker
+from .metrics import RequestMetrics
+from .rate_limiter import RateLimiter
+from .scheduler import RequestScheduler
+from .const import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RECOVERY_TIMEOUT,
+    COMMAND_GET_PATHS,
+    DEFAULT_HOST,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_REQUEST_TIMEOUT,
+    LOGGER,
+    REQUEST_CACHE_TTL,
+    UNCACHED_GET_PATHS,
+    RATE_LIMIT_BURST,
+    TOKEN_DEFAULT_LIFETIME,
+    CircuitState,
+    THROTTLING_STATUSES,
+    TOKEN_REFRESH_MARGIN,
+)
 
 
 class AmbientikaApiClientError(Exception):
@@ -21,48 +57,407 @@ class AmbientikaApiClientAuthenticationError(AmbientikaApiClientError):
     """Exception to indicate an authentication error."""
 
 
-class AmbientikaApiClient:
-    """API Client Class."""
+class AmbientikaApiClientCommunicationError(AmbientikaApiClientError):
+    """Exception to indicate that the server can't be reached."""
+
+
+class AmbientikaApiClientCircuitOpenError(AmbientikaApiClientError):
+    """Exception to indicate that requests are paused because the API keeps failing."""
+
+
+class AmbientikaSession(AmbientikaApi):
+    """Authenticated API connection that keeps its bearer token fresh.
+
+    All houses and devices share this connection, so a renewed token is picked up by every request.
+    The token is only renewed when it expires or when the server rejects it with a 401.
+    Every request waits for its turn in the scheduler, goes through the circuit breaker and is bounded by the
+    request timeout. Its latency and outcome are recorded in `metrics`.
+
+    Identical GET requests in flight at the same time share a single request, and their result is reused for
+    a few seconds, whichever code path asked for it. A command drops the reused results of the device it
+    changed, as they are outdated. The houses are never reused, see `UNCACHED_GET_PATHS`.
+
+    Unlike ambientika_py, which opens a new HTTP session (and TLS connection) for every request, all requests
+    are sent through the given aiohttp session so its pooled keep-alive connections are reused.
+    """
 
-    def __init__(self, username: str, password: str) -> None:
-        """Create an instance of the API."""
+    def __init__(
+        self,
+        websession: aiohttp.ClientSession,
+        host: str,
+        username: str,
+        password: str,
+    ) -> None:
+        """Initialize the session without authenticating yet."""
+        super().__init__(host, 0, "")
+        self._websession = websession
         self._username = username
         self._password = password
-        self._host = DEFAULT_HOST
+        self._expires_at = 0.0
+        self._authenticated_at: float | None = None
+        self._auth_lock = asyncio.Lock()
+        self.request_timeout: float = DEFAULT_REQUEST_TIMEOUT
+        self.circuit_breaker = CircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT
+        )
+        self.metrics = RequestMetrics()
+        # Replaced by the scheduler shared by all entries, see `async_get_scheduler`.
+        self.scheduler = RequestScheduler(
+            DEFAULT_MAX_CONCURRENCY, RateLimiter(DEFAULT_RATE_LIMIT, RATE_LIMIT_BURST)
+        )
+        self._in_flight: dict[tuple, asyncio.Task[Result[Any, HttpError]]] = {}
+        self._cache: dict[tuple, tuple[float, Result[Any, HttpError]]] = {}
+        # Increased by every command, results fetched before are not reused.
+        self._generations: dict[str | None, int] = {}
 
-    async def async_get_data(self) -> list[Device]:
-        """Get all devices from the API.
+    @property
+    def token_age(self) -> float | None:
+        """Return the seconds since the token was issued, None before the first authentication."""
+        if self._authenticated_at is None:
+            return None
+        return time.monotonic() - self._authenticated_at
+
+    @property
+    def token_valid(self) -> bool:
+        """Return whether the cached token can still be used."""
+        return bool(self.token) and time.monotonic() < self._expires_at
+
+    async def async_ensure_token(self) -> None:
+        """Authenticate if there is no valid token."""
+        if not self.token_valid:
+            await self.async_authenticate(stale_token=self.token)
+
+    async def async_authenticate(self, stale_token: str | None = None) -> None:
+        """Request a new token.
 
-        The devices are flattend. Meaning, the information about rooms and houses is not made available to hass.
+        Concurrent callers wait for the same attempt: once the lock is acquired the token is only renewed
+        if it is still the one the caller considered stale.
         """
+        async with self._auth_lock:
+            if self.token != stale_token and self.token_valid:
+                return
 
-        try:
             LOGGER.debug("Authenticating with Ambientika API.")
-            authenticator = await authenticate(
-                self._username, self._password, self._host
+            try:
+                result = await self._async_send(
+                    "POST",
+                    "users/authenticate",
+                    json={"username": self._username, "password": self._password},
+                )
+            except (aiohttp.ClientError, TimeoutError) as exception:
+                raise AmbientikaApiClientCommunicationError(
+                    "Server can't be reached"
+                ) from exception
+            match result:
+                case Success(data):
+                    self.id = data["id"]
+                    self.token = data["jwtToken"]
+                    self._authenticated_at = time.monotonic()
+                case Failure(error) if (
+                    error["status_code"] < HTTPStatus.INTERNAL_SERVER_ERROR
+                    and error["status_code"] not in THROTTLING_STATUSES
+                ):
+                    raise AmbientikaApiClientAuthenticationError("Invalid credentials")
+                case Failure(error):
+                    raise AmbientikaApiClientCommunicationError(
+                        f"Server can't be reached: {error}"
+                    )
+
+            self._expires_at = (
+                time.monotonic()
+                + _token_lifetime(self.token)
+                - TOKEN_REFRESH_MARGIN.total_seconds()
             )
-            api_client = authenticator.unwrap()
-        except UnwrapFailedError as exception:
-            raise AmbientikaApiClientAuthenticationError(
-                "Server can't be reached or Invalid credentials"
-            ) from exception  # no idea if the UnwrapFilaedError should be used here.
+
+    async def get(
+        self, path: str, params: dict[str, Any] = {}
+    ) -> Result[Any, HttpError]:
+        """Fetch JSON data from an authenticated API endpoint."""
+        if path in COMMAND_GET_PATHS:
+            return await self._async_command(
+                "GET", path, params.get("deviceSerialNumber"), params=params
+            )
+
+        key = (path, tuple(sorted(params.items())))
+        if (cached := self._cache.get(key)) and time.monotonic() < cached[0]:
+            return cached[1]
+        if (task := self._in_flight.get(key)) is None:
+            task = self._in_flight[key] = asyncio.create_task(
+                self._async_shared_get(key, path, params)
+            )
+            # Retrieves the exception if every caller was cancelled.
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        # A caller giving up, e.g. on the refresh timeout, must not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    async def post(self, path: str, body: dict[str, Any]) -> Result[None, HttpError]:
+        """Post JSON data to an authenticated API endpoint."""
+        return await self._async_command(
+            "POST", path, body.get("deviceSerialNumber"), json=body
+        )
+
+    async def _async_shared_get(
+        self, key: tuple, path: str, params: dict[str, Any]
+    ) -> Result[Any, HttpError]:
+        """Fetch JSON data for all callers waiting for it and keep it for a few seconds."""
+        serial_number = params.get("deviceSerialNumber")
+        generation = self._generations.get(serial_number, 0)
+        try:
+            result = await self._async_request("GET", path, params=params)
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+        if (
+            isinstance(result, Success)
+            and path not in UNCACHED_GET_PATHS
+            and generation == self._generations.get(serial_number, 0)
+        ):
+            self._cache[key] = (time.monotonic() + REQUEST_CACHE_TTL, result)
+        return result
+
+    async def _async_command(
+        self, method: str, path: str, serial_number: str | None, **kwargs: Any
+    ) -> Result[Any, HttpError]:
+        """Send a request changing a device, its results fetched before or meanwhile are not reused."""
+        self._invalidate(serial_number)
+        try:
+            return await self._async_request(method, path, **kwargs)
+        finally:
+            self._invalidate(serial_number)
+
+    def _invalidate(self, serial_number: str | None) -> None:
+        """Drop the reused results of a device, and let later callers start a new request instead of joining one."""
+        self._generations[serial_number] = self._generations.get(serial_number, 0) + 1
+        for requests in (self._cache, self._in_flight):
+            for key in [
+                key for key in requests if _serial_number(key) == serial_number
+            ]:
+                del requests[key]
+
+    async def _async_request(
+        self, method: str, path: str, **kwargs: Any
+    ) -> Result[Any, HttpError]:
+        """Send an authenticated request, re-authenticating once if the token was rejected."""
+        await self.async_ensure_token()
+        token = self.token
+        result = await self._async_send(
+            method, path, headers={"Authorization": f"Bearer {token}"}, **kwargs
+        )
+        if (
+            isinstance(result, Failure)
+            and result.failure()["status_code"] == HTTPStatus.UNAUTHORIZED
+        ):
+            LOGGER.debug("Token was rejected, re-authenticating.")
+            await self.async_authenticate(stale_token=token)
+            result = await self._async_send(
+                method,
+                path,
+                headers={"Authorization": f"Bearer {self.token}"},
+                **kwargs,
+            )
+        return result
+
+    async def _async_send(
+        self, method: str, path: str, **kwargs: Any
+    ) -> Result[Any, HttpError]:
+        """Send a single request through the scheduler and the circuit breaker."""
+        async with self.scheduler.slot():
+            if not self.circuit_breaker.allow_request():
+                self.metrics.record_rejected()
+                raise AmbientikaApiClientCircuitOpenError(
+                    "Ambientika API keeps failing, requests are paused"
+                )
+
+            succeeded = False
+            started = time.monotonic()
+            try:
+                async with (
+                    asyncio.timeout(self.request_timeout),
+                    self._websession.request(
+                        method, f"{self.host}/{path}", **kwargs
+                    ) as response,
+                ):
+                    # Read first, so parsing the body doesn't wait for the network.
+                    await response.read()
+                    data = await parse_response_body(response)
+                # Only server side errors count, a 4xx means the server is up and answering.
+                succeeded = response.status < HTTPStatus.INTERNAL_SERVER_ERROR
+            except (aiohttp.ClientError, TimeoutError) as exception:
+                self.metrics.record_exception(
+                    path, time.monotonic() - started, exception
+                )
+                raise
+            finally:
+                self.circuit_breaker.record(succeeded)
+            self.metrics.record_response(
+                path, time.monotonic() - started, response.status
+            )
+            self.scheduler.rate_limiter.record(
+                response.status, _retry_after(response.headers.get("Retry-After"))
+            )
+
+        if response.status == HTTPStatus.OK:
+            return Success(data)
+        return Failure({"status_code": response.status, "data": data})
+
+
+class _AmbientikaFacade(Ambientika):
+    """Ambientika API bound to an existing session."""
+
+    def __init__(self, session: AmbientikaSession) -> None:
+        """Initialize the API with a session instead of a fixed token."""
+        self._api = session
+
+
+class AmbientikaApiClient:
+    """API Client Class."""
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        websession: aiohttp.ClientSession,
+        host: str = DEFAULT_HOST,
+    ) -> None:
+        """Create an instance of the API.
+
+        The websession is usually the one shared by Home Assistant, see `async_get_clientsession`.
+        The host is the one of the Ambientika cloud, unless e.g. a local simulator is used.
+        """
+        self._host = host.rstrip("/")
+        self._session = AmbientikaSession(websession, self._host, username, password)
+
+    @property
+    def request_timeout(self) -> float:
+        """Return the seconds after which a single request is given up."""
+        return self._session.request_timeout
+
+    @request_timeout.setter
+    def request_timeout(self, request_timeout: float) -> None:
+        """Set the seconds after which a single request is given up."""
+        self._session.request_timeout = request_timeout
+
+    @property
+    def host(self) -> str:
+        """Return the host the client talks to."""
+        return self._host
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """Return the scheduler of all requests."""
+        return self._session.scheduler
+
+    @scheduler.setter
+    def scheduler(self, scheduler: RequestScheduler) -> None:
+        """Set the scheduler of all requests, e.g. one shared with other clients."""
+        self._session.scheduler = scheduler
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """Return the rate limiter of all requests."""
+        return self._session.scheduler.rate_limiter
+
+    @property
+    def queued_requests(self) -> int:
+        """Return the number of requests waiting to be sent, by all clients sharing the scheduler."""
+        return self._session.scheduler.queued
+
+    @property
+    def token_age(self) -> float | None:
+        """Return the seconds since the token was issued, None before the first authentication."""
+        return self._session.token_age
+
+    @property
+    def metrics(self) -> RequestMetrics:
+        """Return the metrics of the requests sent so far."""
+        return self._session.metrics
+
+    @property
+    def circuit_state(self) -> CircuitState:
+        """Return the state of the circuit breaker guarding all requests."""
+        return self._session.circuit_breaker.state
+
+    async def async_get_houses(self) -> list[House]:
+        """Get all houses from the API, with their rooms and devices."""
+
+        await self._session.async_ensure_token()
+        api_client = _AmbientikaFacade(self._session)
 
         LOGGER.debug("fetching houses.")
-        houses = await api_client.houses()
-        if isinstance(houses, Failure):
-            raise AmbientikaApiClientError("Ambientika does not have houses set up")
+        try:
+            houses_info = await self._session.get("house/houses-info")
+            if isinstance(houses_info, Failure):
+                raise AmbientikaApiClientError("Ambientika does not have houses set up")
+            # Unlike `Ambientika.houses`, which silently drops the houses it could not fetch, a house
+            # missing from the result would look like its devices were removed from the account.
+            houses = await asyncio.gather(
+                *(
+                    api_client.house_complete_info(house["houseId"])
+                    for house in houses_info.unwrap()
+                )
+            )
+        except (aiohttp.ClientError, TimeoutError) as exception:
+            raise AmbientikaApiClientCommunicationError(
+                "Server can't be reached"
+            ) from exception
+
+        try:
+            return [house.unwrap() for house in houses]
+        except UnwrapFailedError as exception:
+            raise AmbientikaApiClientError("Could not fetch houses") from exception
 
+    def houses_from_data(self, data: list[dict[str, Any]]) -> list[House]:
+        """Rebuild houses from data in the format of the API, e.g. from a cache."""
+        return [House(house, self._session) for house in data]
+
+    async def async_get_data(self) -> list[Device]:
+        """Get all devices from the API.
+
+        The devices are flattend. Use `async_get_houses` to get the rooms and houses they belong to.
+        """
+        houses = await self.async_get_houses()
         try:
             # TODO: write tests
             LOGGER.debug("fetching devices.")
-            return [
-                # AmbientikaEntity(device)
-                device
-                for house in houses.unwrap()
-                for room in house.rooms
-                for device in room.devices
-            ]
-        except UnwrapFailedError as exception:
-            raise AmbientikaApiClientError("Could not fetch devices") from exception
+            return flatten_devices(houses)
         except Exception as exception:
             raise AmbientikaApiClientError("Unknown error") from exception
+
+
+def flatten_devices(houses: list[House]) -> list[Device]:
+    """Return the devices of all rooms of the houses."""
+    return [
+        device for house in houses for room in house.rooms for device in room.devices
+    ]
+
+
+def _serial_number(key: tuple) -> str | None:
+    """Return the serial number of the device a GET request is about, None if it is about none."""
+    _, params = key
+    return dict(params).get("deviceSerialNumber")
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Return the seconds to wait from a `Retry-After` header, given in seconds or as a date."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def _token_lifetime(token: str) -> float:
+    """Return the seconds until the JWT expires, falling back to a default lifetime."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"]) - time.time()
+    except (IndexError, KeyError, TypeError, ValueError):
+        return TOKEN_DEFAULT_LIFETIME.total_seconds()
@@ -0,0 +1,48 @@
+"""Backoff for devices that repeatedly fail to answer.
+
+Slave units are often unpowered. Instead of requesting their status at full rate forever, a failing
+device is skipped for an exponentially growing, jittered delay, and polled normally again as soon as
+it answers.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+
+class DeviceBackoff:
+    """Exponential backoff with jitter for a single device."""
+
+    def __init__(self, initial: float, maximum: float) -> None:
+        """Initialize the backoff with the delays in seconds."""
+        self.initial = initial
+        self.maximum = maximum
+        self.failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Return whether the device should be skipped for now."""
+        return self.failures > 0 and time.monotonic() < self._retry_at
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until the device is polled again, 0 if it is not skipped."""
+        return max(0.0, self._retry_at - time.monotonic()) if self.active else 0.0
+
+    def record_failure(self) -> float:
+        """Record a failed request and return the delay in seconds until the next attempt."""
+        self.failures += 1
+        delay = min(self.maximum, self.initial * 2 ** (self.failures - 1))
+        # Jitter between half and the full delay, so devices that failed together don't retry together.
+        delay = random.uniform(delay / 2, delay)
+        self._retry_at = time.monotonic() + delay
+        return delay
+
+    def record_success(self) -> bool:
+        """Reset the backoff and return whether the device was failing before."""
+        was_failing = self.failures > 0
+        self.failures = 0
+        self._retry_at = 0.0
+        return was_failing
@@ -2,15 +2,15 @@
 
 from __future__ import annotations
 
-from ambientika_py import Device, DeviceStatus
-from returns.result import Failure, Success
+from ambientika_py import Device
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN, LOGGER
+from .entity import AmbientikaEntity
 from .hub import AmbientikaHub
 
 
@@ -22,62 +22,28 @@ async def async_setup_entry(
 
     # TODO: this could be simplified with ENTITY_DESCTIPTIONS, but requires event subscription
     # https://github.com/DeebotUniverse/Deebot-4-Home-Assistant/blob/dev/custom_components/deebot/sensor.py#L79
-    async_add_entities(HumidityAlarmBinarySensor(device) for device in hub.devices)
-    async_add_entities(NightAlarmBinarySensor(device) for device in hub.devices)
+    @callback
+    def async_add_devices(devices: list[Device]) -> None:
+        async_add_entities(HumidityAlarmBinarySensor(hub, device) for device in devices)
+        async_add_entities(NightAlarmBinarySensor(hub, device) for device in devices)
 
+    entry.async_on_unload(hub.async_add_device_listener(async_add_devices))
 
-class BinarySensorBase(BinarySensorEntity):
-    """Base representation of an Ambientika Sensor."""
-
-    # TODO:
-    # should_poll = False
-
-    def __init__(self, device: Device) -> None:
-        """Initialize the sensor."""
-        self._device = device
-        self._status: DeviceStatus | None = None
 
-    @property
-    def device_info(self):
-        # TODO: move this to a common base class shared with climate.py
-        """Return information to link this entity with the correct device."""
-        return {
-            "identifiers": {(DOMAIN, self._device.serial_number)},
-            "name": self._device.name,
-            "manufacturer": "SUEDWIND",
-            "model": "Ambientika",
-            "serial_number": self._device.serial_number,
-        }
-
-    # TODO: move this to a common base class shared with climate.py
-    async def async_update(self) -> None:
-        """Fetch new state data for this device."""
-        LOGGER.debug(
-            "Updating binary sensor entity for device %s", self._device.serial_number
-        )
-        status = await self._device.status()
-        match status:
-            case Success(data):
-                self._status = data
-            case Failure(error):
-                LOGGER.error(
-                    "Could not fetch status for device %s. %s",
-                    self._device.serial_number,
-                    error,
-                )
-                self._status = None
+class BinarySensorBase(AmbientikaEntity, BinarySensorEntity):
+    """Base representation of an Ambientika Sensor."""
 
 
 class HumidityAlarmBinarySensor(BinarySensorBase):
     """Humidity Alarm Binary Sensor."""
 
-    _attr_has_entity_name = True
     _attr_translation_key = "humidity_alarm"
+    _status_fields = ("humidity_alarm",)
     _attr_icon = "mdi:alarm-light"
 
-    def __init__(self, device) -> None:
+    def __init__(self, hub: AmbientikaHub, device: Device) -> None:
         """Initialize the sensor."""
-        super().__init__(device)
+        super().__init__(hub, device)
         self._attr_unique_id = f"{self._device.name}_humidity_alarm"
         LOGGER.debug(f"Creating AmbientikaBinarySensor: {self._device.name}")
 
@@ -91,13 +57,13 @@ class HumidityAlarmBinarySensor(BinarySensorBase):
 class NightAlarmBinarySensor(BinarySensorBase):
     """Humidity Alarm Binary Sensor."""
 
-    _attr_has_entity_name = True
     _attr_translation_key = "night_alarm"
+    _status_fields = ("night_alarm",)
     _attr_icon = "mdi:alarm-light"
 
-    def __init__(self, device) -> None:
+    def __init__(self, hub: AmbientikaHub, device: Device) -> None:
         """Initialize the sensor."""
-        super().__init__(device)
+        super().__init__(hub, device)
         self._attr_unique_id = f"{self._device.name}_night_alarm"
         LOGGER.debug(f"Creating AmbientikaBinarySensor: {self._device.name}")
 
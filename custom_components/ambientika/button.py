@@ -13,13 +13,15 @@ from ambientika_py import Device
 
 from homeassistant.components.button import ButtonEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from returns.result import Failure, Success
 
 from .const import DOMAIN, LOGGER
+from .entity import AmbientikaEntity
 from .hub import AmbientikaHub
+from .scheduler import RequestPriority, use_priority
 
 
 async def async_setup_entry(
@@ -30,38 +32,29 @@ async def async_setup_entry(
     """Create the `button` entities for each device."""
     hub: AmbientikaHub = hass.data[DOMAIN][entry.entry_id]
 
-    # TODO: should we not mount the slave devices?
-    async_add_entities((FilterResetButton(device, hub) for device in hub.devices), True)
+    @callback
+    def async_add_devices(devices: list[Device]) -> None:
+        # TODO: should we not mount the slave devices?
+        async_add_entities(FilterResetButton(device, hub) for device in devices)
 
+    entry.async_on_unload(hub.async_add_device_listener(async_add_devices))
 
-class FilterResetButton(ButtonEntity):
+
+class FilterResetButton(AmbientikaEntity, ButtonEntity):
     """Representation of a button.
 
     ambientika_py does not offer a method for resetting the filter.
     Because of that we have to use the API directly - and therefore forward the AmbientikaHub to the Button.
     """
 
-    _attr_has_entity_name = True
     _attr_translation_key = "filter_reset"
 
     def __init__(self, device: Device, hub: AmbientikaHub) -> None:
         """Initialize the button."""
-        self._device = device
+        super().__init__(hub, device)
         self._hub = hub
         self._attr_unique_id = f"{self._device.name}_filter_reset"
 
-    @property
-    def device_info(self):
-        # TODO: move this to a common base class shared with climate.py
-        """Return information to link this entity with the correct device."""
-        return {
-            "identifiers": {(DOMAIN, self._device.serial_number)},
-            "name": self._device.name,
-            "manufacturer": "SUEDWIND",
-            "model": "Ambientika",
-            "serial_number": self._device.serial_number,
-        }
-
     async def async_press(self) -> None:
         """Handle the button press."""
         LOGGER.debug(
@@ -69,9 +62,11 @@ class FilterResetButton(ButtonEntity):
             "button",
             self._device.serial_number,
         )
-        response = await self._device.api.get(
-            "device/reset-filter", {"deviceSerialNumber": self._device.serial_number}
-        )
+        with use_priority(RequestPriority.COMMAND):
+            response = await self._device.api.get(
+                "device/reset-filter",
+                {"deviceSerialNumber": self._device.serial_number},
+            )
         match response:
             case Success(data):
                 LOGGER.debug(
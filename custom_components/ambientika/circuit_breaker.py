@@ -0,0 +1,80 @@
+"""Circuit breaker around the Ambientika cloud API.
+
+When the cloud is down, every request would otherwise wait for the full timeout. After a number of
+consecutive failures the circuit opens and requests fail fast. Once the recovery timeout has passed a
+single probe request is let through, and its outcome decides whether the circuit closes again.
+
+References:
+ - https://martinfowler.com/bliki/CircuitBreaker.html
+
+"""
+
+from __future__ import annotations
+
+import time
+
+from .const import LOGGER, CircuitState
+
+
+class CircuitBreaker:
+    """Closed, open and half-open circuit for all requests of one API client."""
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float) -> None:
+        """Initialize a closed circuit."""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self._state = CircuitState.Closed
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """Return the state of the circuit."""
+        if (
+            self._state is CircuitState.Open
+            and time.monotonic() - self._opened_at >= self.recovery_timeout
+        ):
+            return CircuitState.HalfOpen
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now.
+
+        In the half-open state only one probe request is allowed until its outcome has been recorded.
+        """
+        match self.state:
+            case CircuitState.Closed:
+                return True
+            case CircuitState.HalfOpen if not self._probe_in_flight:
+                self._state = CircuitState.HalfOpen
+                self._probe_in_flight = True
+                return True
+            case _:
+                return False
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a request that was allowed."""
+        probe = self._probe_in_flight
+        self._probe_in_flight = False
+
+        if success:
+            if self._state is not CircuitState.Closed:
+                LOGGER.info("Ambientika API is reachable again, closing the circuit.")
+            self.failures = 0
+            self._state = CircuitState.Closed
+            return
+
+        self.failures += 1
+        if probe or (
+            self._state is CircuitState.Closed
+            and self.failures >= self.failure_threshold
+        ):
+            if not probe:
+                LOGGER.warning(
+                    "Ambientika API failed %s times in a row, pausing requests for %ss.",
+                    self.failures,
+                    self.recovery_timeout,
+                )
+            self._state = CircuitState.Open
+            self._opened_at = time.monotonic()
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from ambientika_py import Device, DeviceStatus, FanSpeed, HumidityLevel, OperatingMode
 
 from homeassistant.components.climate import ClimateEntity
@@ -15,21 +17,25 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 # from homeassistant.util.percentage import (
 # ordered_list_item_to_percentage,
 # percentage_to_ordered_list_item,
 # )
 
+import aiohttp
 from returns.result import Failure, Success
 
+from .api import AmbientikaApiClientError
 from .const import (
     DOMAIN,
     LOGGER,
     # ORDERED_NAMED_FAN_SPEEDS,
     # ORDERED_NAMED_HUMIDITY_LEVELS,
 )
+from .entity import AmbientikaEntity
 from .hub import AmbientikaHub
 
 FAN_SPEED_AMBIENTIKA_TO_HVAC = {
@@ -56,51 +62,36 @@ async def async_setup_entry(
     """Create the `climate` entities for each device."""
     hub: AmbientikaHub = _hass.data[DOMAIN][entry.entry_id]
 
-    # TODO: should we not mount the slave devices?
-    async_add_entities((AmbientikaClimate(device) for device in hub.devices), True)
+    @callback
+    def async_add_devices(devices: list[Device]) -> None:
+        # TODO: should we not mount the slave devices?
+        async_add_entities(AmbientikaClimate(hub, device) for device in devices)
 
+    entry.async_on_unload(hub.async_add_device_listener(async_add_devices))
 
-class AmbientikaClimate(ClimateEntity):
-    """Representation of an Ambientika device."""
 
-    # TODO:
-    # _attr_should_poll = True
+class AmbientikaClimate(AmbientikaEntity, ClimateEntity):
+    """Representation of an Ambientika device."""
 
-    _attr_has_entity_name = True
     _attr_name = None
     _attr_translation_key = "climate"
+    _status_fields = (
+        "operating_mode",
+        "fan_speed",
+        "humidity_level",
+        "humidity",
+        "temperature",
+    )
     _attr_max_humidity = 3
     _attr_min_humidity = 1
     # _attr_icon = "mdi:air-conditioner"
     # _attr_device_class = "climate"
 
-    def __init__(self, device: Device) -> None:
-        """Initialize an Ambientika device."""
-        self._device = device
-        self._status: DeviceStatus | None = None
-
     @property
     def unique_id(self) -> str:
         """Return a unique ID."""
         return f"climate_{self._device.name}_{self._device.serial_number}"
 
-    @property
-    def device_info(self) -> dict:
-        # TODO: move this to a common base class shared with sensor.py
-        """Return the device information."""
-        return {
-            "identifiers": {(DOMAIN, self._device.serial_number)},
-            "name": self._device.name,
-            "manufacturer": "SUEDWIND",
-            "model": "Ambientika",
-            "serial_number": self._device.serial_number,
-        }
-
-    @property
-    def available(self) -> bool:
-        """Returns wether the device is currently available."""
-        return self._status is not None
-
     @property
     def name(self) -> str:
         """Return the display name of this device."""
@@ -230,7 +221,6 @@ class AmbientikaClimate(ClimateEntity):
             return
 
         await self.async_set_device(fan_mode=fan_mode)
-        # self.async_write_ha_state()
 
     async def async_set_humidity(self, humidity: int) -> None:
         """Set the humidity."""
@@ -238,7 +228,6 @@ class AmbientikaClimate(ClimateEntity):
             return
 
         await self.async_set_device(humidity=humidity)
-        self.async_write_ha_state()
 
     async def async_turn_on(self) -> None:
         """Turn device on."""
@@ -264,83 +253,70 @@ class AmbientikaClimate(ClimateEntity):
         if not self._status:
             return
 
+        changes = {}
         if operation_mode:
-            target_mode = OperatingMode[operation_mode]
-        else:
-            if self._status["operating_mode"]:
-                target_mode = self._status["operating_mode"]
-            else:
-                target_mode = OperatingMode.Auto
-
+            changes["operating_mode"] = OperatingMode[operation_mode]
         if fan_mode:
-            target_speed = FanSpeed[FAN_SPEED_HVAC_TO_AMBIENTIKA[fan_mode].name]
-        else:
-            if self._status["fan_speed"]:
-                target_speed = self._status["fan_speed"]
-            else:
-                target_speed = FanSpeed.Low
-
+            changes["fan_speed"] = FanSpeed[FAN_SPEED_HVAC_TO_AMBIENTIKA[fan_mode].name]
         if humidity:
-            target_humidity = HUMIDITY_INT_TO_LEVEL[humidity]
-        else:
-            if self._status["humidity_level"]:
-                target_humidity = self._status["humidity_level"]
-            else:
-                target_humidity = HumidityLevel.Normal
+            changes["humidity_level"] = HUMIDITY_INT_TO_LEVEL[humidity]
+        if not changes:
+            return
 
-        LOGGER.debug(
-            "Writing to device %s: mode %s, fan speed %s, humidity_level %s",
-            self._device.serial_number,
-            target_mode,
-            target_speed,
-            target_humidity,
-        )
-        status = await self._device.change_mode(
-            {
-                "operating_mode": target_mode,
-                "fan_speed": target_speed,
-                "humidity_level": target_humidity,
-            }
-        )
-        match status:
+        LOGGER.debug("Writing to device %s: %s", self._device.serial_number, changes)
+        # Show the change right away, the command is held back shortly to merge it with the ones following.
+        status = self._status
+        applied = dict(changes)
+        if "operating_mode" in changes:
+            applied["last_operating_mode"] = status["operating_mode"]
+        previous = {field: status[field] for field in applied}
+        status.update(applied)
+        self.async_write_ha_state()
+
+        try:
+            result = await self.coordinator.async_change_mode(self._device, changes)
+        except (
+            AmbientikaApiClientError,
+            aiohttp.ClientError,
+            TimeoutError,
+        ) as exception:
+            raise self._command_failed(
+                status, applied, previous, exception
+            ) from exception
+        finally:
+            # Confirms the change, or restores the actual state if it failed.
+            await self.coordinator.async_schedule_device_refresh(self._device)
+
+        match result:
             case Success(_):
                 LOGGER.debug(
                     "Writing to device %s: success", self._device.serial_number
                 )
-                self._status["last_operating_mode"] = self._status["operating_mode"]
-                self._status["operating_mode"] = target_mode
+                self.coordinator.async_note_activity()
             case Failure(error):
-                LOGGER.error(
-                    "Writing to device %s: failed. %s",
-                    self._device.serial_number,
-                    error,
-                )
+                raise self._command_failed(status, applied, previous, error)
 
-    async def async_update(self) -> None:
-        """Fetch new state data for this device."""
+    def _command_failed(
+        self,
+        status: DeviceStatus,
+        applied: dict[str, Any],
+        previous: dict[str, Any],
+        error: object,
+    ) -> HomeAssistantError:
+        """Show the state before a failed change again, and return the error to raise."""
         LOGGER.debug(
-            "[%s] Updating device %s.",
-            "climate",
-            self._device.serial_number,
+            "Writing to device %s: failed. %s", self._device.serial_number, error
+        )
+        # Only the fields still showing the change, a refresh may have updated the others meanwhile.
+        for field, value in applied.items():
+            if status[field] == value:
+                status[field] = previous[field]
+        self.async_write_ha_state()
+        return HomeAssistantError(
+            translation_domain=DOMAIN,
+            translation_key="command_failed",
+            translation_placeholders={
+                "device": self._device.name,
+                "error": str(error),
+            },
         )
-        status = await self._device.status()
-        match status:
-            case Success(data):
-                LOGGER.debug(
-                    "[%s] Updating device %s: operating_mode=%s humidity=%s fan_speed=%s humidity_level=%s",
-                    "climate",
-                    self._device.serial_number,
-                    data["operating_mode"],
-                    data["humidity"],
-                    data["fan_speed"],
-                    data["humidity_level"],
-                )
-                self._status = data
-            case Failure(error):
-                LOGGER.error(
-                    "[%s] Updating device %s: failed. %s",
-                    "climate",
-                    self._device.serial_number,
-                    error,
-                )
-                self._status = None
@@ -0,0 +1,78 @@
+"""Coalescing of the commands sent to a device.
+
+Dragging the humidity slider or tapping through the presets causes a burst of commands, each of them a full
+write of the operating mode, fan speed and humidity level. The commands for a device are held back for a
+short window and merged, the last value of each field winning, and sent as a single `change_mode` call
+whose result is shared by every caller.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from ambientika_py import Device, DeviceMode, HttpError
+from returns.result import Failure, Result
+
+from .const import MODE_FIELDS
+
+
+class DeviceCommandQueue:
+    """Merges the mode changes requested for one device within a short window."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device: Device,
+        delay: float,
+        current_mode: Callable[[], dict[str, Any] | None],
+        send: Callable[[Device, DeviceMode], Awaitable[Result[None, HttpError]]],
+    ) -> None:
+        """Initialize the queue.
+
+        `current_mode` returns the last known mode of the device, used for the fields no caller changed.
+        `send` sends the merged command, e.g. through `Device.change_mode`.
+        """
+        self._hass = hass
+        self._device = device
+        self._delay = delay
+        self._current_mode = current_mode
+        self._send = send
+        self._pending: dict[str, Any] = {}
+        self._flush: asyncio.Task[Result[None, HttpError]] | None = None
+
+    async def async_change_mode(
+        self, changes: dict[str, Any]
+    ) -> Result[None, HttpError]:
+        """Queue the changed fields and return the result of the merged command."""
+        self._pending.update(changes)
+        if self._flush is None:
+            self._flush = self._hass.async_create_background_task(
+                self._async_flush(),
+                f"ambientika change_mode {self._device.serial_number}",
+            )
+        # A caller giving up must not cancel the command for the others.
+        return await asyncio.shield(self._flush)
+
+    async def _async_flush(self) -> Result[None, HttpError]:
+        """Send the merged changes once the window has passed."""
+        await asyncio.sleep(self._delay)
+        # Changes queued from now on go into the next command.
+        changes, self._pending, self._flush = self._pending, {}, None
+        current = self._current_mode() or {}
+        mode = {field: changes.get(field, current.get(field)) for field in MODE_FIELDS}
+        if None in mode.values():
+            return Failure(
+                {"status_code": 0, "data": "The current mode of the device is unknown"}
+            )
+        return await self._send(self._device, DeviceMode(**mode))
+
+    def async_cancel(self) -> None:
+        """Drop the pending changes, e.g. on unload."""
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush = None
+        self._pending = {}
@@ -6,18 +6,52 @@ https://developers.home-assistant.io/docs/config_entries_config_flow_handler
 
 from __future__ import annotations
 
+from collections.abc import Mapping
+from typing import Any
+
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_SCAN_INTERVAL,
+    CONF_USERNAME,
+)
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import (
     AmbientikaApiClient,
     AmbientikaApiClientAuthenticationError,
     AmbientikaApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .const import (
+    CONF_BACKOFF_INITIAL,
+    CONF_BACKOFF_MAX,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_REQUESTS_PER_HOUR,
+    CONF_RATE_LIMIT,
+    CONF_STALE_FAILURES,
+    CONF_STALE_MAX_AGE,
+    CONF_REFRESH_TIMEOUT,
+    CONF_REQUEST_TIMEOUT,
+    DATA_VALIDATED_CLIENTS,
+    DEFAULT_BACKOFF_INITIAL,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_HOST,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_REQUESTS_PER_HOUR,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_STALE_FAILURES,
+    DEFAULT_STALE_MAX_AGE,
+    DEFAULT_REFRESH_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    LOGGER,
+)
 
 
 class AmbientikaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -26,6 +60,14 @@ class AmbientikaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> AmbientikaOptionsFlowHandler:
+        """Create the options flow."""
+        return AmbientikaOptionsFlowHandler()
+
     async def async_step_user(
         self,
         user_input: dict | None = None,
@@ -35,8 +77,11 @@ class AmbientikaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
         if user_input is not None:
             try:
-                devices = await _test_pairing(
-                    user_input[CONF_USERNAME], user_input[CONF_PASSWORD]
+                client, devices = await _test_pairing(
+                    user_input[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                    async_get_clientsession(self.hass),
+                    user_input.get(CONF_HOST, DEFAULT_HOST),
                 )
             except AmbientikaApiClientAuthenticationError as exception:
                 LOGGER.warning(exception)
@@ -52,23 +97,80 @@ class AmbientikaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 if len(devices) == 0:
                     return self.async_abort(reason="no_supported_devices_found")
 
+                self.hass.data.setdefault(DATA_VALIDATED_CLIENTS, {})[
+                    user_input[CONF_USERNAME]
+                ] = client
                 return self.async_create_entry(
                     title=user_input[CONF_USERNAME],
                     data=user_input,
                 )
 
+        schema = {
+            vol.Required(
+                CONF_USERNAME,
+                default=(user_input or {}).get(CONF_USERNAME, vol.UNDEFINED),
+            ): selector.TextSelector(
+                selector.TextSelectorConfig(type=selector.TextSelectorType.TEXT),
+            ),
+            vol.Required(CONF_PASSWORD): selector.TextSelector(
+                selector.TextSelectorConfig(type=selector.TextSelectorType.PASSWORD),
+            ),
+        }
+        # Another host is only useful for testing, e.g. against scripts/simulate.
+        if self.show_advanced_options:
+            schema[
+                vol.Required(
+                    CONF_HOST, default=(user_input or {}).get(CONF_HOST, DEFAULT_HOST)
+                )
+            ] = selector.TextSelector(
+                selector.TextSelectorConfig(type=selector.TextSelectorType.URL),
+            )
+
         return self.async_show_form(
             step_id="user",
+            data_schema=vol.Schema(schema),
+            errors=errors,
+        )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle the password being rejected, e.g. after it was changed."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self,
+        user_input: dict | None = None,
+    ) -> FlowResult:
+        """Ask for the new password of the account."""
+        entry = self._get_reauth_entry()
+        errors = {}
+
+        if user_input is not None:
+            try:
+                await _test_pairing(
+                    entry.data[CONF_USERNAME],
+                    user_input[CONF_PASSWORD],
+                    async_get_clientsession(self.hass),
+                    entry.data.get(CONF_HOST, DEFAULT_HOST),
+                )
+            except AmbientikaApiClientAuthenticationError as exception:
+                LOGGER.warning(exception)
+                errors["base"] = "auth"
+            except AmbientikaApiClientError as exception:
+                LOGGER.exception(exception)
+                errors["base"] = "unknown"
+            except Exception as exception:  # pylint: disable=broad-except
+                LOGGER.exception(exception)
+                errors["base"] = "unknown"
+
+            if not errors:
+                return self.async_update_reload_and_abort(
+                    entry, data_updates={CONF_PASSWORD: user_input[CONF_PASSWORD]}
+                )
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
             data_schema=vol.Schema(
                 {
-                    vol.Required(
-                        CONF_USERNAME,
-                        default=(user_input or {}).get(CONF_USERNAME, vol.UNDEFINED),
-                    ): selector.TextSelector(
-                        selector.TextSelectorConfig(
-                            type=selector.TextSelectorType.TEXT
-                        ),
-                    ),
                     vol.Required(CONF_PASSWORD): selector.TextSelector(
                         selector.TextSelectorConfig(
                             type=selector.TextSelectorType.PASSWORD
@@ -76,10 +178,83 @@ class AmbientikaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     ),
                 }
             ),
+            description_placeholders={"username": entry.data[CONF_USERNAME]},
             errors=errors,
         )
 
 
-async def _test_pairing(username, password) -> list:
-    client = AmbientikaApiClient(username, password)
-    return await client.async_get_data()
+class AmbientikaOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options Flow Class.
+
+    The options are applied to the running hub, without reloading the entry.
+    """
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> FlowResult:
+        """Manage the polling, concurrency and timeout options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                vol.Schema(
+                    {
+                        vol.Required(
+                            CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
+                        ): _number_selector(30, unit="s"),
+                        vol.Required(
+                            CONF_MAX_REQUESTS_PER_HOUR,
+                            default=DEFAULT_MAX_REQUESTS_PER_HOUR,
+                        ): _number_selector(0),
+                        vol.Required(
+                            CONF_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY
+                        ): _number_selector(1, 32),
+                        vol.Required(
+                            CONF_RATE_LIMIT, default=DEFAULT_RATE_LIMIT
+                        ): _number_selector(1, 100, unit="requests/s"),
+                        vol.Required(
+                            CONF_REQUEST_TIMEOUT, default=DEFAULT_REQUEST_TIMEOUT
+                        ): _number_selector(1, unit="s"),
+                        vol.Required(
+                            CONF_REFRESH_TIMEOUT, default=DEFAULT_REFRESH_TIMEOUT
+                        ): _number_selector(1, unit="s"),
+                        vol.Required(
+                            CONF_STALE_FAILURES, default=DEFAULT_STALE_FAILURES
+                        ): _number_selector(1),
+                        vol.Required(
+                            CONF_STALE_MAX_AGE, default=DEFAULT_STALE_MAX_AGE
+                        ): _number_selector(1, unit="s"),
+                        vol.Required(
+                            CONF_BACKOFF_INITIAL, default=DEFAULT_BACKOFF_INITIAL
+                        ): _number_selector(1, unit="s"),
+                        vol.Required(
+                            CONF_BACKOFF_MAX, default=DEFAULT_BACKOFF_MAX
+                        ): _number_selector(1, unit="s"),
+                    }
+                ),
+                self.config_entry.options,
+            ),
+        )
+
+
+def _number_selector(
+    minimum: int, maximum: int | None = None, unit: str | None = None
+) -> vol.All:
+    config = selector.NumberSelectorConfig(
+        min=minimum, step=1, mode=selector.NumberSelectorMode.BOX
+    )
+    if maximum is not None:
+        config["max"] = maximum
+    if unit is not None:
+        config["unit_of_measurement"] = unit
+    return vol.All(selector.NumberSelector(config), vol.Coerce(int))
+
+
+async def _test_pairing(
+    username, password, websession, host
+) -> tuple[AmbientikaApiClient, list]:
+    client = AmbientikaApiClient(username, password, websession, host)
+    return client, await client.async_get_data()
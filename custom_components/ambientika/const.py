@@ -1,5 +1,7 @@
 """Constants for ambientika."""
 
+from datetime import timedelta
+from http import HTTPStatus
 from enum import StrEnum
 from logging import Logger, getLogger
 
@@ -10,8 +12,142 @@ NAME = "Ambientika"
 DOMAIN = "ambientika"
 VERSION = "1.0.0"
 
+# Clients validated by the config flow, keyed by username, picked up by the first setup of the entry.
+DATA_VALIDATED_CLIENTS = f"{DOMAIN}_validated_clients"
+
+# Interval between two fetches of the houses, rooms and devices, which rarely change.
+TOPOLOGY_REFRESH_INTERVAL = timedelta(hours=1)
+# Version of the stored houses, rooms and devices, increase when the format changes.
+TOPOLOGY_STORAGE_VERSION = 1
+# Seconds to wait before writing a changed topology to disk.
+TOPOLOGY_SAVE_DELAY = 10
+
 DEFAULT_HOST = "https://app.ambientika.eu:4521"  # This is the default from ambientika_py. I am not aware of other values yet.
 
+# Consecutive failed requests after which requests are paused.
+CIRCUIT_FAILURE_THRESHOLD = 5
+# Seconds requests are paused before a single probe request is let through.
+CIRCUIT_RECOVERY_TIMEOUT = 60
+
+# Requests in flight at the same time beyond the concurrency of the polling, so commands don't wait for a slot.
+SCHEDULER_RESERVED_SLOTS = 2
+# Interval the scheduler sensors are sampled at, they change between the refreshes.
+SCHEDULER_SAMPLE_INTERVAL = timedelta(seconds=5)
+# Request schedulers shared by all entries, keyed by host.
+DATA_SCHEDULERS = f"{DOMAIN}_schedulers"
+
+# The running profiler, see `start_profiling`.
+DATA_PROFILER = f"{DOMAIN}_profiler"
+
+# Rate limiters shared by all entries, keyed by host.
+DATA_RATE_LIMITERS = f"{DOMAIN}_rate_limiters"
+# Requests that may be sent at once after a quiet period.
+RATE_LIMIT_BURST = 20
+# Lowest rate, relative to the configured one, the limiter slows down to when the API throttles.
+RATE_LIMIT_MIN_FACTOR = 0.05
+# Rate regained with every successful response, relative to the configured one.
+RATE_LIMIT_RECOVERY_STEP = 0.02
+# Upper limit in seconds for honoring a `Retry-After` header.
+RETRY_AFTER_MAX = 600
+# Responses telling that the API is overloaded.
+THROTTLING_STATUSES = (
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+)
+
+# Seconds the result of a GET request is reused for identical requests.
+REQUEST_CACHE_TTL = 2
+# Endpoints whose result is never reused, the houses are fetched to see their devices change.
+UNCACHED_GET_PATHS = ("house/houses-info", "house/house-complete-info")
+# Endpoints changing a device although they are requested with GET.
+COMMAND_GET_PATHS = ("device/reset-filter",)
+
+# Names of the endpoints in the request metrics, by path.
+API_ENDPOINTS = {
+    "users/authenticate": "auth",
+    "house/houses-info": "houses",
+    "house/house-complete-info": "houses",
+    "device/device-status": "status",
+    "device/change-mode": "change_mode",
+    "device/reset-filter": "reset_filter",
+}
+# Upper bounds in seconds of the buckets of the latency histograms.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Latencies kept per endpoint to compute the percentiles from.
+LATENCY_SAMPLES = 200
+# Last requests kept with their timings, for the diagnostics.
+RECENT_REQUESTS_KEPT = 1000
+# Last refresh cycles kept, for the diagnostics.
+REFRESH_CYCLES_KEPT = 10
+
+# Used if the expiry can't be read from the JWT.
+TOKEN_DEFAULT_LIFETIME = timedelta(hours=1)
+# Renew the token this long before it expires.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=1)
+
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_REFRESH_TIMEOUT = "refresh_timeout"
+CONF_BACKOFF_INITIAL = "backoff_initial"
+CONF_BACKOFF_MAX = "backoff_max"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_MAX_REQUESTS_PER_HOUR = "max_requests_per_hour"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_STALE_FAILURES = "stale_failures"
+CONF_STALE_MAX_AGE = "stale_max_age"
+
+# Seconds between two refreshes while the devices are neither idle nor busy.
+DEFAULT_SCAN_INTERVAL = 300
+# Upper limit of requests per hour the polling may cause, 0 disables the limit.
+DEFAULT_MAX_REQUESTS_PER_HOUR = 1000
+# Requests per second to a host, shared by all entries.
+DEFAULT_RATE_LIMIT = 20
+# Maximum number of status requests in flight at the same time.
+DEFAULT_MAX_CONCURRENCY = 4
+# Seconds after which the devices that did not answer yet are given up for the current refresh.
+DEFAULT_REFRESH_TIMEOUT = 30
+# Seconds an unreachable device is skipped after its first failure, doubled on every further failure.
+DEFAULT_BACKOFF_INITIAL = 60
+# Upper limit in seconds for skipping an unreachable device.
+DEFAULT_BACKOFF_MAX = 3600
+# Refreshes in a row without a status after which a device becomes unavailable. Until then its last status is kept.
+DEFAULT_STALE_FAILURES = 3
+# Seconds after the last status after which a device becomes unavailable, even if fewer refreshes failed.
+DEFAULT_STALE_MAX_AGE = 900
+# Seconds after which a single request to the API is given up.
+DEFAULT_REQUEST_TIMEOUT = 10
+
+# Interval used for a while after a command or a state change, to show the outcome quickly.
+FAST_POLL_INTERVAL = timedelta(seconds=30)
+FAST_POLL_WINDOW = timedelta(minutes=5)
+# Interval used after this many refreshes without any state change.
+SLOW_POLL_INTERVAL = timedelta(minutes=15)
+IDLE_POLL_CYCLES = 6
+# Seconds commands for a device are held back to merge them with the ones following in quick succession.
+COMMAND_DEBOUNCE_DELAY = 0.5
+# Fields of a `DeviceMode`, written together by every command.
+MODE_FIELDS = ("operating_mode", "fan_speed", "humidity_level")
+# Seconds after a command until the status of the device is fetched to confirm it.
+VERIFY_REFRESH_DELAY = 5
+# Fields of `DeviceStatus` that describe a state. Measurements like temperature change all the time.
+STATE_FIELDS = (
+    "operating_mode",
+    "fan_speed",
+    "humidity_level",
+    "humidity_alarm",
+    "night_alarm",
+    "filters_status",
+)
+
+SERVICE_SET_MODE = "set_mode"
+SERVICE_SET_ROOM_MODE = "set_room_mode"
+SERVICE_REFRESH_TOPOLOGY = "refresh_topology"
+SERVICE_START_PROFILING = "start_profiling"
+SERVICE_STOP_PROFILING = "stop_profiling"
+ATTR_HOUSE = "house"
+ATTR_ROOM = "room"
+
 # ORDERED_NAMED_FAN_SPEEDS = [name for name, _ in FanSpeed.__members__.items()]
 # ORDERED_NAMED_HUMIDITY_LEVELS = [name for name, _ in HumidityLevel.__members__.items()]
 
@@ -32,3 +168,23 @@ class AirQuality(StrEnum):
     Medium = "medium"
     Poor = "poor"
     Bad = "bad"
+
+
+class CircuitState(StrEnum):
+    """The state of the circuit breaker guarding the API."""
+
+    Closed = "closed"
+    Open = "open"
+    HalfOpen = "half_open"
+
+
+class RequestErrorClass(StrEnum):
+    """The class of error of a failed request."""
+
+    Timeout = "timeout"
+    Connection = "connection"
+    CircuitOpen = "circuit_open"
+    Unauthorized = "unauthorized"
+    Throttled = "throttled"
+    Client = "client"
+    Server = "server"
@@ -0,0 +1,118 @@
+"""Diagnostics support for ambientika.
+
+Only data the hub and the client have already collected is read, nothing is requested from the API, so
+the diagnostics can be downloaded from a loaded installation at any time.
+
+References:
+ - https://developers.home-assistant.io/docs/core/integration_diagnostics
+
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ambientika_py import Device
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntry
+
+from .const import DOMAIN
+from .hub import AmbientikaHub
+
+TO_REDACT = {
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    "serial_number",
+    "serialNumber",
+    "device_serial_number",
+    "userId",
+    "address",
+    "latitude",
+    "longitude",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    hub: AmbientikaHub = hass.data[DOMAIN][entry.entry_id]
+    client = hub.client
+    rate_limiter = client.rate_limiter
+
+    cycles = [
+        {
+            "started": cycle["started"],
+            "duration": cycle["duration"],
+            "error": cycle["error"],
+            "devices": cycle["devices"],
+            "failed_devices": cycle["failed_devices"],
+            "requests": client.metrics.requests_between(
+                cycle["monotonic"], cycle["monotonic"] + cycle["duration"]
+            ),
+        }
+        for cycle in hub.refresh_cycles
+    ]
+
+    return async_redact_data(
+        {
+            "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+            "hub": {
+                "last_update_success": hub.last_update_success,
+                "update_interval": hub.update_interval
+                and hub.update_interval.total_seconds(),
+                "last_refresh_duration": hub.last_refresh_duration,
+            },
+            "client": {
+                "host": client.host,
+                "token_age": client.token_age,
+                "circuit_state": client.circuit_state,
+                "rate_limiter": {
+                    "rate": rate_limiter.rate,
+                    "max_rate": rate_limiter.max_rate,
+                    "throttled": rate_limiter.throttled,
+                },
+                "queued_requests": client.queued_requests,
+                "max_in_flight": client.scheduler.max_in_flight,
+                "request_timeout": client.request_timeout,
+            },
+            "requests": client.metrics.as_dict(),
+            "refresh_cycles": cycles,
+            "topology": hub.topology.data,
+            "devices": [_device_diagnostics(hub, device) for device in hub.devices],
+        },
+        TO_REDACT,
+    )
+
+
+async def async_get_device_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry, device_entry: DeviceEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a device, or the whole entry for the account."""
+    hub: AmbientikaHub = hass.data[DOMAIN][entry.entry_id]
+    identifiers = {
+        identifier
+        for domain, identifier in device_entry.identifiers
+        if domain == DOMAIN
+    }
+    for device in hub.devices:
+        if device.serial_number in identifiers:
+            return async_redact_data(_device_diagnostics(hub, device), TO_REDACT)
+
+    return await async_get_config_entry_diagnostics(hass, entry)
+
+
+def _device_diagnostics(hub: AmbientikaHub, device: Device) -> dict[str, Any]:
+    return {
+        "name": device.name,
+        "serial_number": device.serial_number,
+        "device_type": device.device_type,
+        "role": device.role,
+        "room_id": device.room_id,
+        "zone_index": device.zone_index,
+        **hub.device_diagnostics(device.serial_number),
+    }
@@ -0,0 +1,132 @@
+"""Base entity shared by all Ambientika platforms.
+
+References:
+ - https://developers.home-assistant.io/docs/integration_fetching_data/#coordinated-single-api-poll-for-data-for-all-entities
+
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from ambientika_py import Device, DeviceStatus
+
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .hub import AmbientikaHub
+
+
+class AmbientikaEntity(CoordinatorEntity[AmbientikaHub]):
+    """Entity reading the status of one device from the hub's snapshot."""
+
+    _attr_has_entity_name = True
+    # Fields of `DeviceStatus` the entity shows, updates changing none of them don't write its state.
+    _status_fields: tuple[str, ...] = ()
+
+    def __init__(self, hub: AmbientikaHub, device: Device) -> None:
+        """Initialize the entity."""
+        super().__init__(hub)
+        self._device = device
+        # Availability and staleness when the state was last written.
+        self._written: tuple[bool, bool] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the availability and staleness of the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._written = (
+            self.available,
+            self.coordinator.device_stale(self._device.serial_number),
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if a field shown by the entity, its availability or its staleness changed.
+
+        Most refreshes change nothing, writing the state of every entity anyway would only load the
+        state machine and the recorder.
+        """
+        serial_number = self._device.serial_number
+        written = (self.available, self.coordinator.device_stale(serial_number))
+        changed = self.coordinator.changed_fields.get(serial_number, set())
+        if written == self._written and changed.isdisjoint(self._status_fields):
+            return
+
+        self._written = written
+        self.async_write_ha_state()
+
+    @property
+    def _status(self) -> DeviceStatus | None:
+        """Return the status of the device from the last refresh."""
+        if not self.coordinator.data:
+            return None
+
+        return self.coordinator.data.get(self._device.serial_number)
+
+    @property
+    def device_info(self):
+        """Return information to link this entity with the correct device."""
+        return {
+            "identifiers": {(DOMAIN, self._device.serial_number)},
+            "name": self._device.name,
+            "manufacturer": "SUEDWIND",
+            "model": "Ambientika",
+            "serial_number": self._device.serial_number,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return False if we can't resolve the device's status, or it is too old.
+
+        A failed refresh alone doesn't make the entity unavailable, see `AmbientikaHub.device_available`.
+        """
+        return self.coordinator.device_available(self._device.serial_number)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return when the status was fetched, only while the last status is kept after a failed refresh.
+
+        While the status is fresh the attribute is left out, so it doesn't cause a state write every refresh.
+        """
+        if not self.coordinator.device_stale(self._device.serial_number):
+            return None
+        return {
+            "last_successful_update": self.coordinator.last_updates.get(
+                self._device.serial_number
+            )
+        }
+
+
+class AmbientikaHubEntity(CoordinatorEntity[AmbientikaHub]):
+    """Diagnostic entity describing the hub itself rather than a device.
+
+    These entities are attached to a service device representing the Ambientika account.
+    """
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, hub: AmbientikaHub, key: str) -> None:
+        """Initialize the entity."""
+        super().__init__(hub)
+        self._attr_translation_key = key
+        self._attr_unique_id = f"{hub.config_entry.entry_id}_{key}"
+
+    @property
+    def device_info(self):
+        """Return information to link this entity with the account."""
+        return {
+            "identifiers": {(DOMAIN, self.coordinator.config_entry.entry_id)},
+            "name": self.coordinator.config_entry.title,
+            "manufacturer": "SUEDWIND",
+            "model": "Ambientika Cloud",
+            "entry_type": DeviceEntryType.SERVICE,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Return True, the diagnostics are most interesting when refreshing fails."""
+        return True
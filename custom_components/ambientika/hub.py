@@ -7,63 +7,701 @@ References:
 
 from __future__ import annotations
 
-from collections.abc import Mapping
-from datetime import timedelta
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
+from enum import Enum
+from functools import partial
 from typing import Any
 
+import aiohttp
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_SCAN_INTERVAL,
+    CONF_USERNAME,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.debounce import Debouncer
 
 from homeassistant.helpers.update_coordinator import UpdateFailed, DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
+from ambientika_py import Device, DeviceMode, DeviceStatus, House, HttpError
+from returns.result import Failure, Result, Success
 
 from .api import (
     AmbientikaApiClient,
     AmbientikaApiClientAuthenticationError,
+    AmbientikaApiClientCircuitOpenError,
+    AmbientikaApiClientCommunicationError,
     AmbientikaApiClientError,
+    flatten_devices,
+)
+from .backoff import DeviceBackoff
+from .commands import DeviceCommandQueue
+from .polling import AdaptivePollingPolicy
+from .scheduler import RequestPriority, async_get_scheduler, use_priority
+from .topology import TopologyCache
+from .const import (
+    COMMAND_DEBOUNCE_DELAY,
+    CONF_BACKOFF_INITIAL,
+    CONF_BACKOFF_MAX,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_REQUESTS_PER_HOUR,
+    CONF_RATE_LIMIT,
+    CONF_STALE_FAILURES,
+    CONF_STALE_MAX_AGE,
+    CONF_REFRESH_TIMEOUT,
+    CONF_REQUEST_TIMEOUT,
+    DEFAULT_BACKOFF_INITIAL,
+    DEFAULT_BACKOFF_MAX,
+    DEFAULT_HOST,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_REQUESTS_PER_HOUR,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_REFRESH_TIMEOUT,
+    DEFAULT_REQUEST_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STALE_FAILURES,
+    DEFAULT_STALE_MAX_AGE,
+    DOMAIN,
+    FAST_POLL_INTERVAL,
+    FAST_POLL_WINDOW,
+    IDLE_POLL_CYCLES,
+    LOGGER,
+    REFRESH_CYCLES_KEPT,
+    SLOW_POLL_INTERVAL,
+    STATE_FIELDS,
+    VERIFY_REFRESH_DELAY,
+    CircuitState,
 )
-from .const import DOMAIN, LOGGER
 
 
-class AmbientikaHub(DataUpdateCoordinator):
-    """Connection Hub to all devices."""
+class AmbientikaHub(DataUpdateCoordinator[dict[str, DeviceStatus | None]]):
+    """Connection Hub to all devices.
+
+    The hub is the single source of device status: each refresh fetches the status of every device once
+    and keeps it in a snapshot keyed by serial number, which all entities read from.
+    """
 
     config_entry: ConfigEntry
 
-    def __init__(self, hass: HomeAssistant, config: Mapping[str, Any]) -> None:
-        """Initialize the hub to manage all devices and the API facade."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config: Mapping[str, Any],
+        options: Mapping[str, Any] | None = None,
+        client: AmbientikaApiClient | None = None,
+    ) -> None:
+        """Initialize the hub to manage all devices and the API facade.
+
+        A client that was already authenticated (e.g. by the config flow) can be passed in to reuse its session.
+        """
         self._hass_config = hass
         self._hass = hass
         self._credentials = {
+            "host": config.get(CONF_HOST, DEFAULT_HOST),
             "username": config.get(CONF_USERNAME, ""),
             "password": config.get(CONF_PASSWORD, ""),
         }
-        self.devices = []
+        self.client = client or AmbientikaApiClient(
+            username=self._credentials["username"],
+            password=self._credentials["password"],
+            websession=async_get_clientsession(hass),
+            host=self._credentials["host"],
+        )
+        self.client.scheduler = async_get_scheduler(hass, self.client.host)
+        # Seeded by the first refresh. The devices are the ones of all rooms of all houses.
+        self.houses: list[House] = []
+        self.devices: list[Device] = []
+        # Whether the devices were fetched since the start, rather than restored from the cache.
+        self._topology_fetched = False
+        # Reason of the failure for each device whose status could not be fetched in the last refresh.
+        self.failed_devices: dict[str, str] = {}
+        # Fields of the status of each device changed by the last update, entities of unchanged devices skip
+        # writing their state.
+        self.changed_fields: dict[str, set[str]] = {}
+        # Seconds the last refresh took to fetch the statuses, and the devices if needed.
+        self.last_refresh_duration: float | None = None
+        # The last refreshes, for the diagnostics.
+        self.refresh_cycles: deque[dict[str, Any]] = deque(maxlen=REFRESH_CYCLES_KEPT)
+        # Time of the last status of each device, and the number of refreshes without a status since.
+        self.last_updates: dict[str, datetime] = {}
+        self._missed_refreshes: dict[str, int] = {}
+        self._backoffs: dict[str, DeviceBackoff] = {}
+        self._device_refreshers: dict[str, Debouncer] = {}
+        self._command_queues: dict[str, DeviceCommandQueue] = {}
 
-        super().__init__(
-            hass=hass,
-            logger=LOGGER,
-            name=DOMAIN,
-            update_interval=timedelta(minutes=5),
+        self._max_concurrency = DEFAULT_MAX_CONCURRENCY
+        self._command_semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._refresh_timeout: float = DEFAULT_REFRESH_TIMEOUT
+        self._backoff_initial: float = DEFAULT_BACKOFF_INITIAL
+        self._backoff_max: float = DEFAULT_BACKOFF_MAX
+        self._stale_failures = DEFAULT_STALE_FAILURES
+        self._stale_max_age = timedelta(seconds=DEFAULT_STALE_MAX_AGE)
+        self._polling = AdaptivePollingPolicy(
+            normal_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            fast_interval=FAST_POLL_INTERVAL,
+            slow_interval=SLOW_POLL_INTERVAL,
+            fast_window=FAST_POLL_WINDOW,
+            idle_cycles=IDLE_POLL_CYCLES,
+            max_requests_per_hour=DEFAULT_MAX_REQUESTS_PER_HOUR,
         )
 
-    async def login(self) -> None:
-        """Async loading of the devices."""
+        super().__init__(hass=hass, logger=LOGGER, name=DOMAIN)
+        self.topology = TopologyCache(hass, self.config_entry.entry_id)
+        self._apply_options(options or {})
 
-        self.client = AmbientikaApiClient(
-            username=self._credentials["username"],
-            password=self._credentials["password"],
+    async def async_restore_topology(self) -> bool:
+        """Seed the houses and devices from the cache of the last run, return False if there is none."""
+        if not (data := await self.topology.async_load()):
+            return False
+
+        try:
+            self.houses = self.client.houses_from_data(data)
+        except (KeyError, TypeError) as exception:
+            LOGGER.warning("HUB: Ignoring the cached devices. %s", exception)
+            return False
+
+        self.devices = flatten_devices(self.houses)
+        LOGGER.debug("HUB: Restored %s devices from the cache.", len(self.devices))
+        return True
+
+    @callback
+    def async_add_device_listener(
+        self, add_devices: Callable[[list[Device]], None]
+    ) -> CALLBACK_TYPE:
+        """Call `add_devices` with the current devices and after each refresh with the newly discovered ones.
+
+        Returns a callback to stop listening.
+        """
+        known: set[str] = set()
+
+        @callback
+        def add_new_devices() -> None:
+            serial_numbers = {device.serial_number for device in self.devices}
+            # Forget removed devices, so they are added again if they come back.
+            known.intersection_update(serial_numbers)
+            if new_devices := [
+                device for device in self.devices if device.serial_number not in known
+            ]:
+                known.update(device.serial_number for device in new_devices)
+                add_devices(new_devices)
+
+        add_new_devices()
+        return self.async_add_listener(add_new_devices)
+
+    def uses_credentials(self, config: Mapping[str, Any]) -> bool:
+        """Return whether the hub is logged in with the credentials of the given entry data."""
+        return self._credentials == {
+            "host": config.get(CONF_HOST, DEFAULT_HOST),
+            "username": config.get(CONF_USERNAME, ""),
+            "password": config.get(CONF_PASSWORD, ""),
+        }
+
+    @callback
+    def async_update_options(self, options: Mapping[str, Any]) -> None:
+        """Apply changed options to the running hub, without reloading the entry."""
+        self._apply_options(options)
+        LOGGER.debug("HUB: Options updated, next refresh in %s.", self.update_interval)
+        self._schedule_refresh()
+
+    def _apply_options(self, options: Mapping[str, Any]) -> None:
+        """Apply the options of the config entry, falling back to the defaults."""
+        self._max_concurrency = options.get(
+            CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY
+        )
+        self._command_semaphore = asyncio.Semaphore(self._max_concurrency)
+        self.client.scheduler.set_limit(
+            self.config_entry.entry_id, self._max_concurrency
+        )
+        self._refresh_timeout = options.get(
+            CONF_REFRESH_TIMEOUT, DEFAULT_REFRESH_TIMEOUT
+        )
+        self._backoff_initial = options.get(
+            CONF_BACKOFF_INITIAL, DEFAULT_BACKOFF_INITIAL
+        )
+        self._backoff_max = options.get(CONF_BACKOFF_MAX, DEFAULT_BACKOFF_MAX)
+        for backoff in self._backoffs.values():
+            backoff.initial = self._backoff_initial
+            backoff.maximum = self._backoff_max
+        self._stale_failures = options.get(CONF_STALE_FAILURES, DEFAULT_STALE_FAILURES)
+        self._stale_max_age = timedelta(
+            seconds=options.get(CONF_STALE_MAX_AGE, DEFAULT_STALE_MAX_AGE)
+        )
+        self.client.request_timeout = options.get(
+            CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT
+        )
+        self._polling.normal_interval = timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        )
+        self.client.rate_limiter.set_limit(
+            self.config_entry.entry_id,
+            options.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+        )
+        self._polling.max_requests_per_hour = options.get(
+            CONF_MAX_REQUESTS_PER_HOUR, DEFAULT_MAX_REQUESTS_PER_HOUR
+        )
+        self.update_interval = self._polling.current_interval(len(self.devices))
+
+    def device_available(self, serial_number: str) -> bool:
+        """Return whether the status of a device is recent enough to be shown.
+
+        After a failed refresh the last status is kept until the device missed `stale_failures` refreshes in a
+        row or the status is older than `stale_max_age`, so a single failure doesn't make it unavailable.
+        The maximum age is at least `stale_failures` polling intervals, as polling may be slower than it.
+        """
+        if not self.data or self.data.get(serial_number) is None:
+            return False
+        max_age = self._stale_max_age
+        if self.update_interval is not None:
+            max_age = max(max_age, self._stale_failures * self.update_interval)
+        return (
+            self._missed_refreshes.get(serial_number, 0) < self._stale_failures
+            and (last_update := self.last_updates.get(serial_number)) is not None
+            and dt_util.utcnow() - last_update <= max_age
+        )
+
+    def device_stale(self, serial_number: str) -> bool:
+        """Return whether the last status of a device is kept although the last refresh failed for it."""
+        return self._missed_refreshes.get(serial_number, 0) > 0
+
+    def device_diagnostics(self, serial_number: str) -> dict[str, Any]:
+        """Return what the hub knows about a device, for the diagnostics."""
+        diagnostics: dict[str, Any] = {
+            "available": self.device_available(serial_number),
+            "stale": self.device_stale(serial_number),
+            "last_update": self.last_updates.get(serial_number),
+            "missed_refreshes": self._missed_refreshes.get(serial_number, 0),
+            "failure": self.failed_devices.get(serial_number),
+            "backoff": None,
+            "status": None,
+        }
+        if backoff := self._backoffs.get(serial_number):
+            diagnostics["backoff"] = {
+                "failures": backoff.failures,
+                "retry_in": backoff.retry_in,
+            }
+        if status := (self.data or {}).get(serial_number):
+            diagnostics["status"] = {
+                field: value.name if isinstance(value, Enum) else value
+                for field, value in status.items()
+            }
+        return diagnostics
+
+    @callback
+    def async_note_activity(self) -> None:
+        """Poll fast for a while, e.g. after a command was sent to a device."""
+        self._polling.note_activity()
+        interval = self._polling.current_interval(len(self.devices))
+        if self.update_interval != interval:
+            self.update_interval = interval
+            # Moves the next refresh closer instead of waiting for the slow one already scheduled.
+            self._schedule_refresh()
+
+    async def async_change_mode(
+        self, device: Device, changes: dict[str, Any]
+    ) -> Result[None, HttpError]:
+        """Change the mode of a device.
+
+        Changes requested in quick succession are merged into a single command, see `DeviceCommandQueue`.
+        Fields not in `changes` keep their current value.
+        """
+        serial_number = device.serial_number
+        if (queue := self._command_queues.get(serial_number)) is None:
+            queue = self._command_queues[serial_number] = DeviceCommandQueue(
+                self.hass,
+                device,
+                COMMAND_DEBOUNCE_DELAY,
+                lambda: (self.data or {}).get(serial_number),
+                self._async_send_command,
+            )
+        return await queue.async_change_mode(changes)
+
+    async def _async_send_command(
+        self, device: Device, mode: DeviceMode
+    ) -> Result[None, HttpError]:
+        """Send a command, at most `max_concurrency` are in flight at once."""
+        async with self._command_semaphore:
+            with use_priority(RequestPriority.COMMAND):
+                return await device.change_mode(mode)
+
+    async def async_change_group_mode(
+        self, devices: list[Device], changes: dict[str, Any]
+    ) -> dict[str, dict[str, Any]]:
+        """Change the mode of several devices concurrently, e.g. of all devices of a room.
+
+        Returns the outcome for each device by serial number. A failing device does not affect the others.
+        """
+
+        async def change(device: Device) -> str | None:
+            try:
+                result = await self.async_change_mode(device, changes)
+            except (aiohttp.ClientError, TimeoutError) as exception:
+                return f"Server can't be reached: {exception!r}"
+            except AmbientikaApiClientError as exception:
+                return str(exception)
+            match result:
+                case Success(_):
+                    return None
+                case Failure(error):
+                    return str(error)
+
+        errors = await asyncio.gather(*(change(device) for device in devices))
+        LOGGER.debug(
+            "HUB: Changed the mode of %s/%s devices to %s.",
+            errors.count(None),
+            len(devices),
+            changes,
         )
-        self.devices = await self.client.async_get_data()
 
-    async def _async_update_data(self):
-        """Update data via library."""
+        results: dict[str, dict[str, Any]] = {}
+        self.changed_fields = {}
+        for device, error in zip(devices, errors, strict=True):
+            results[device.serial_number] = {
+                "name": device.name,
+                "success": error is None,
+                "error": error,
+            }
+            if error is None and (
+                status := (self.data or {}).get(device.serial_number)
+            ):
+                # Show the change right away, like the climate entity does.
+                if "operating_mode" in changes:
+                    status["last_operating_mode"] = status["operating_mode"]
+                status.update(changes)
+                self.changed_fields[device.serial_number] = {
+                    *changes,
+                    "last_operating_mode",
+                }
+            await self.async_schedule_device_refresh(device)
+        self.async_note_activity()
+        self.async_update_listeners()
+        return results
+
+    async def async_schedule_device_refresh(self, device: Device) -> None:
+        """Refresh the status of a single device a few seconds from now, e.g. to confirm a command.
+
+        Further calls before the refresh ran are merged into it.
+        """
+        if (refresher := self._device_refreshers.get(device.serial_number)) is None:
+            refresher = self._device_refreshers[device.serial_number] = Debouncer(
+                self.hass,
+                LOGGER,
+                cooldown=VERIFY_REFRESH_DELAY,
+                immediate=False,
+                function=partial(self._async_refresh_device, device),
+            )
+        await refresher.async_call()
+
+    async def _async_refresh_device(self, device: Device) -> None:
+        """Fetch the status of a single device and notify the entities."""
+        try:
+            with use_priority(RequestPriority.VERIFY):
+                status = await self._async_fetch_status(device)
+        except AmbientikaApiClientError as exception:
+            LOGGER.debug(
+                "HUB: Could not refresh device %s. %s", device.serial_number, exception
+            )
+            return
+
+        if self.data is not None:
+            self.changed_fields = {
+                device.serial_number: _changed_fields(
+                    self.data.get(device.serial_number), status
+                )
+            }
+            self.data[device.serial_number] = status
+            self._record_status(device.serial_number)
+            self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the scheduled refreshes and the queued commands."""
+        await super().async_shutdown()
+        for refresher in self._device_refreshers.values():
+            refresher.async_shutdown()
+        for queue in self._command_queues.values():
+            queue.async_cancel()
+        self.client.scheduler.remove_limit(self.config_entry.entry_id)
+        self.client.rate_limiter.remove_limit(self.config_entry.entry_id)
+
+    async def async_refresh_topology(self) -> None:
+        """Fetch the houses, rooms and devices, and add or remove the entities of the devices that changed.
+
+        The topology rarely changes, it is refreshed much less often than the status of the devices.
+        """
+        previous = {device.serial_number for device in self.devices}
+        await self._async_update_topology()
+
+        new_devices = [
+            device for device in self.devices if device.serial_number not in previous
+        ]
+        self.changed_fields = {}
+        self.async_update_listeners()
+        # The next status refresh may be a while away.
+        for device in new_devices:
+            await self.async_schedule_device_refresh(device)
+
+    async def async_scheduled_refresh_topology(self, _now: datetime) -> None:
+        """Refresh the topology, called periodically."""
         try:
+            await self.async_refresh_topology()
+        except AmbientikaApiClientAuthenticationError:
+            self.config_entry.async_start_reauth(self.hass)
+        except AmbientikaApiClientError as exception:
+            LOGGER.warning("HUB: Could not refresh the devices. %s", exception)
+
+    async def _async_update_topology(self) -> None:
+        """Fetch the houses, rooms and devices, and forget the devices that were removed."""
+        LOGGER.debug("HUB: Fetching devices from Ambientika API.")
+        with use_priority(RequestPriority.TOPOLOGY):
+            self.houses = await self.client.async_get_houses()
+        previous = {device.serial_number for device in self.devices}
+        self.devices = flatten_devices(self.houses)
+        self._topology_fetched = True
+        self.topology.async_save(self.houses)
+        self._async_remove_devices(
+            previous - {device.serial_number for device in self.devices}
+        )
+
+    async def _async_update_data(self) -> dict[str, DeviceStatus | None]:
+        """Update data via library.
+
+        Only the status of the devices is fetched, the devices themselves are fetched by the first refresh and
+        then by `async_refresh_topology`.
+        """
+        started = time.monotonic()
+        cycle: dict[str, Any] = {"started": dt_util.utcnow(), "error": None}
+        try:
+            if not self._topology_fetched:
+                await self._async_update_topology()
             LOGGER.debug("HUB: Fetching data from Ambientika API.")
-            return await self.client.async_get_data()
+            statuses = await self._async_fetch_statuses()
+            if self.devices and not any(statuses.values()):
+                raise AmbientikaApiClientError(
+                    "Could not fetch the status of any device"
+                )
         except AmbientikaApiClientAuthenticationError as exception:
+            cycle["error"] = str(exception)
             raise ConfigEntryAuthFailed(exception) from exception
         except AmbientikaApiClientError as exception:
+            cycle["error"] = str(exception)
+            # The last snapshot is kept, the devices turn unavailable once it is too old. The coordinator only
+            # notifies the entities of the first of several failed refreshes, so they are notified here.
+            self.changed_fields = {}
+            for device in self.devices:
+                self._record_missed_refresh(device.serial_number)
+            self.async_update_listeners()
             raise UpdateFailed(exception) from exception
+        finally:
+            self.last_refresh_duration = time.monotonic() - started
+            self.refresh_cycles.append(
+                cycle
+                | {
+                    "monotonic": started,
+                    "duration": self.last_refresh_duration,
+                    "devices": len(self.devices),
+                    "failed_devices": len(self.failed_devices),
+                }
+            )
+
+        self.update_interval = self._polling.next_interval(
+            changed=self._states_changed(statuses),
+            # The status of every device.
+            requests_per_cycle=len(self.devices),
+        )
+        LOGGER.debug("HUB: Next refresh in %s.", self.update_interval)
+
+        # Serve the last status of the devices without a status, as long as it is recent enough.
+        for serial_number, status in statuses.items():
+            if status is not None:
+                self._record_status(serial_number)
+            else:
+                self._record_missed_refresh(serial_number)
+                if self.device_available(serial_number):
+                    statuses[serial_number] = self.data[serial_number]
+
+        previous = self.data or {}
+        self.changed_fields = {
+            serial_number: changed
+            for serial_number, status in statuses.items()
+            if (changed := _changed_fields(previous.get(serial_number), status))
+        }
+        LOGGER.debug("HUB: %s devices changed.", len(self.changed_fields))
+        return statuses
+
+    def _record_status(self, serial_number: str) -> None:
+        """Record that the status of a device was fetched."""
+        self.last_updates[serial_number] = dt_util.utcnow()
+        self._missed_refreshes[serial_number] = 0
+
+    def _record_missed_refresh(self, serial_number: str) -> None:
+        """Record that a refresh did not fetch the status of a device."""
+        self._missed_refreshes[serial_number] = (
+            self._missed_refreshes.get(serial_number, 0) + 1
+        )
+
+    @callback
+    def _async_remove_devices(self, serial_numbers: set[str]) -> None:
+        """Forget devices removed from the account, together with their entities."""
+        registry = dr.async_get(self.hass)
+        for serial_number in serial_numbers:
+            LOGGER.info("HUB: Device %s was removed from the account.", serial_number)
+            self._backoffs.pop(serial_number, None)
+            self.last_updates.pop(serial_number, None)
+            self._missed_refreshes.pop(serial_number, None)
+            if refresher := self._device_refreshers.pop(serial_number, None):
+                refresher.async_shutdown()
+            if queue := self._command_queues.pop(serial_number, None):
+                queue.async_cancel()
+            if self.data:
+                self.data.pop(serial_number, None)
+            if device := registry.async_get_device({(DOMAIN, serial_number)}):
+                # Also removes the entities of the device.
+                registry.async_update_device(
+                    device.id, remove_config_entry_id=self.config_entry.entry_id
+                )
+
+    def _states_changed(self, statuses: dict[str, DeviceStatus | None]) -> bool:
+        """Return whether the state of any device changed since the last refresh."""
+        if not self.data:
+            return False
+
+        return any(
+            (previous := self.data.get(serial_number))
+            and status
+            and any(previous[field] != status[field] for field in STATE_FIELDS)
+            for serial_number, status in statuses.items()
+        )
+
+    async def _async_fetch_statuses(self) -> dict[str, DeviceStatus | None]:
+        """Fetch the status of all devices concurrently.
+
+        At most `max_concurrency` requests are in flight at once, and devices that did not answer before
+        `refresh_timeout` are cancelled, so a single slow device can't stall the whole refresh.
+        Failures are reported per device in `failed_devices` instead of failing the refresh.
+        Devices in backoff are skipped.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def fetch(device: Device) -> DeviceStatus:
+            async with semaphore:
+                return await self._async_fetch_status(device)
+
+        statuses: dict[str, DeviceStatus | None] = {
+            device.serial_number: None for device in self.devices
+        }
+        tasks = {
+            device.serial_number: asyncio.create_task(fetch(device))
+            for device in self.devices
+            if not self._backoff(device.serial_number).active
+        }
+        self.failed_devices = {}
+        if not tasks:
+            return statuses
+
+        _, pending = await asyncio.wait(tasks.values(), timeout=self._refresh_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        # Failures caused by the API being down or throttling are not the fault of the devices, don't back off
+        # from them. Neither from devices cut off by the refresh timeout, most may still have been waiting for
+        # their turn to send a request.
+        paused: set[str] = set()
+        for serial_number, task in tasks.items():
+            if task in pending:
+                self.failed_devices[serial_number] = "timed out"
+                paused.add(serial_number)
+            elif isinstance(
+                exception := task.exception(), AmbientikaApiClientAuthenticationError
+            ):
+                raise exception
+            elif isinstance(
+                exception,
+                AmbientikaApiClientCircuitOpenError
+                | AmbientikaApiClientCommunicationError,
+            ):
+                self.failed_devices[serial_number] = str(exception)
+                paused.add(serial_number)
+            elif exception is not None:
+                self.failed_devices[serial_number] = str(exception)
+            else:
+                statuses[serial_number] = task.result()
+                if self._backoff(serial_number).record_success():
+                    LOGGER.info("HUB: Device %s is reachable again.", serial_number)
+
+        for serial_number, reason in self.failed_devices.items():
+            if (
+                serial_number in paused
+                or self.client.circuit_state is not CircuitState.Closed
+                or self.client.rate_limiter.throttled
+            ):
+                continue
+            backoff = self._backoff(serial_number)
+            delay = backoff.record_failure()
+            # Only the first failure is worth a warning, unpowered devices would flood the log otherwise.
+            LOGGER.log(
+                logging.WARNING if backoff.failures == 1 else logging.DEBUG,
+                "HUB: Could not fetch status for device %s, retrying in %.0fs. %s",
+                serial_number,
+                delay,
+                reason,
+            )
+        LOGGER.debug(
+            "HUB: Fetched the status of %s/%s devices, %s skipped.",
+            len(tasks) - len(self.failed_devices),
+            len(tasks),
+            len(statuses) - len(tasks),
+        )
+        return statuses
+
+    def _backoff(self, serial_number: str) -> DeviceBackoff:
+        """Return the backoff of a device."""
+        if (backoff := self._backoffs.get(serial_number)) is None:
+            backoff = self._backoffs[serial_number] = DeviceBackoff(
+                self._backoff_initial, self._backoff_max
+            )
+        return backoff
+
+    async def _async_fetch_status(self, device: Device) -> DeviceStatus:
+        """Fetch the status of a single device."""
+        try:
+            status = await device.status()
+        except (aiohttp.ClientError, TimeoutError) as exception:
+            raise AmbientikaApiClientCommunicationError(
+                f"Server can't be reached: {exception!r}"
+            ) from exception
+
+        match status:
+            case Success(data):
+                LOGGER.debug(
+                    "HUB: Updating device %s: operating_mode=%s humidity=%s fan_speed=%s humidity_level=%s",
+                    device.serial_number,
+                    data["operating_mode"],
+                    data["humidity"],
+                    data["fan_speed"],
+                    data["humidity_level"],
+                )
+                return data
+            case Failure(error):
+                raise AmbientikaApiClientError(error)
+
+
+def _changed_fields(
+    previous: DeviceStatus | None, status: DeviceStatus | None
+) -> set[str]:
+    """Return the fields that differ between two statuses of a device, all of them if one is missing."""
+    if previous is None or status is None:
+        return set(previous or status or ())
+    return {field for field, value in status.items() if previous.get(field) != value}
@@ -0,0 +1,177 @@
+"""Metrics of the requests sent to the Ambientika API.
+
+Every request is counted per endpoint, with its latency in a histogram and, if it failed, the class of the
+error. The last latencies of each endpoint are kept to compute percentiles, and the last requests with
+their timings for the diagnostics. Recording a request is a few counter increments and appends, the
+percentiles are only computed when they are read, e.g. by the diagnostic sensors.
+"""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections import Counter, deque
+from http import HTTPStatus
+from typing import Any
+
+import aiohttp
+
+from .const import (
+    API_ENDPOINTS,
+    LATENCY_BUCKETS,
+    LATENCY_SAMPLES,
+    RECENT_REQUESTS_KEPT,
+    THROTTLING_STATUSES,
+    RequestErrorClass,
+)
+
+_HOUR = 3600
+
+
+class EndpointMetrics:
+    """Counters and latencies of the requests to one endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.requests = 0
+        self.errors = 0
+        # Requests by latency, the last bucket counts the ones slower than the largest bound.
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def record(self, latency: float, failed: bool) -> None:
+        """Record a request."""
+        self.requests += 1
+        self.errors += failed
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latencies.append(latency)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Return the latency in seconds below which the given percentage of the last requests completed."""
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[
+            min(len(latencies) - 1, int(len(latencies) * percentile / 100))
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics, e.g. for the diagnostics."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_histogram": dict(
+                zip(
+                    [f"<={bound}s" for bound in LATENCY_BUCKETS]
+                    + [f">{LATENCY_BUCKETS[-1]}s"],
+                    self.histogram,
+                    strict=True,
+                )
+            ),
+            "latency_p50": self.percentile(50),
+            "latency_p95": self.percentile(95),
+        }
+
+
+class RequestMetrics:
+    """Metrics of all requests of one API client."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.errors: Counter[RequestErrorClass] = Counter()
+        # Times the requests of the last hour were sent.
+        self._sent: deque[float] = deque()
+        # The last requests: when they completed, their endpoint, status or class of error, and latency.
+        self.recent: deque[tuple[float, str, int | str, float]] = deque(
+            maxlen=RECENT_REQUESTS_KEPT
+        )
+
+    @property
+    def requests_per_hour(self) -> int:
+        """Return the number of requests sent within the last hour."""
+        self._prune(time.monotonic())
+        return len(self._sent)
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint, see `API_ENDPOINTS`."""
+        if (metrics := self.endpoints.get(name)) is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_response(self, path: str, latency: float, status: int) -> None:
+        """Record a request the server answered."""
+        self._record(path, latency, _error_class(status), status)
+
+    def record_exception(
+        self, path: str, latency: float, exception: BaseException
+    ) -> None:
+        """Record a request that failed without an answer."""
+        if isinstance(exception, TimeoutError):
+            error = RequestErrorClass.Timeout
+        elif isinstance(exception, aiohttp.ClientError):
+            error = RequestErrorClass.Connection
+        else:
+            return
+        self._record(path, latency, error, str(error))
+
+    def record_rejected(self) -> None:
+        """Record a request that was not sent because the circuit is open."""
+        self.errors[RequestErrorClass.CircuitOpen] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics, e.g. for the diagnostics."""
+        return {
+            "requests_per_hour": self.requests_per_hour,
+            "errors": {str(error): count for error, count in self.errors.items()},
+            "endpoints": {
+                name: metrics.as_dict() for name, metrics in self.endpoints.items()
+            },
+        }
+
+    def requests_between(self, start: float, end: float) -> list[dict[str, Any]]:
+        """Return the recent requests completed within a time span, in `time.monotonic` seconds."""
+        return [
+            {
+                "offset": round(completed - latency - start, 3),
+                "endpoint": endpoint,
+                "outcome": outcome,
+                "latency": round(latency, 3),
+            }
+            for completed, endpoint, outcome, latency in self.recent
+            if start <= completed <= end
+        ]
+
+    def _record(
+        self,
+        path: str,
+        latency: float,
+        error: RequestErrorClass | None,
+        outcome: int | str,
+    ) -> None:
+        now = time.monotonic()
+        self._prune(now)
+        self._sent.append(now)
+        endpoint = API_ENDPOINTS.get(path.lower(), "other")
+        self.endpoint(endpoint).record(latency, error is not None)
+        self.recent.append((now, endpoint, outcome, latency))
+        if error is not None:
+            self.errors[error] += 1
+
+    def _prune(self, now: float) -> None:
+        """Forget the requests sent more than an hour ago."""
+        while self._sent and now - self._sent[0] > _HOUR:
+            self._sent.popleft()
+
+
+def _error_class(status: int) -> RequestErrorClass | None:
+    """Return the class of error of a response status, None for a success."""
+    if status < HTTPStatus.BAD_REQUEST:
+        return None
+    if status == HTTPStatus.UNAUTHORIZED:
+        return RequestErrorClass.Unauthorized
+    if status in THROTTLING_STATUSES:
+        return RequestErrorClass.Throttled
+    if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        return RequestErrorClass.Server
+    return RequestErrorClass.Client
@@ -0,0 +1,63 @@
+"""Adaptive polling interval for the hub.
+
+A fixed interval is either too slow right after a command or too fast when nothing happens, e.g. overnight.
+The policy polls fast for a while after activity (a command or a change of a device state), relaxes to a
+slow interval after several cycles without changes, and never exceeds the configured requests per hour.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+
+class AdaptivePollingPolicy:
+    """Chooses the interval until the next refresh."""
+
+    def __init__(
+        self,
+        normal_interval: timedelta,
+        fast_interval: timedelta,
+        slow_interval: timedelta,
+        fast_window: timedelta,
+        idle_cycles: int,
+        max_requests_per_hour: int,
+    ) -> None:
+        """Initialize the policy."""
+        self.normal_interval = normal_interval
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.fast_window = fast_window
+        self.idle_cycles = idle_cycles
+        self.max_requests_per_hour = max_requests_per_hour
+        self._fast_until = 0.0
+        self._unchanged_cycles = 0
+
+    def note_activity(self) -> None:
+        """Poll fast for a while, e.g. after a command was sent to a device."""
+        self._fast_until = time.monotonic() + self.fast_window.total_seconds()
+        self._unchanged_cycles = 0
+
+    def next_interval(self, changed: bool, requests_per_cycle: int) -> timedelta:
+        """Return the interval until the next refresh after a refresh that made `requests_per_cycle` requests."""
+        if changed:
+            self.note_activity()
+        else:
+            self._unchanged_cycles += 1
+        return self.current_interval(requests_per_cycle)
+
+    def current_interval(self, requests_per_cycle: int) -> timedelta:
+        """Return the interval until the next refresh, without counting a refresh."""
+        if time.monotonic() < self._fast_until:
+            interval = self.fast_interval
+        elif self._unchanged_cycles >= self.idle_cycles:
+            interval = max(self.slow_interval, self.normal_interval)
+        else:
+            interval = self.normal_interval
+
+        if self.max_requests_per_hour:
+            interval = max(
+                interval,
+                timedelta(hours=requests_per_cycle / self.max_requests_per_hour),
+            )
+        return interval
@@ -0,0 +1,181 @@
+"""Opt-in profiling of the refreshes, see the `start_profiling` and `stop_profiling` services.
+
+While profiling, cProfile runs and the phases of a refresh are timed: the whole update, fetching the
+topology and the statuses, decoding the responses once received, converting them to statuses, notifying the
+entities and each state write.
+The phases are timed by wrapping the methods of the running hubs and entities, which are restored when
+profiling stops, so nothing is measured and nothing costs anything while profiling is off. Entities added
+while profiling are not timed.
+
+When profiling stops, the cProfile stats and a summary of the phases are written to the config directory.
+The stats can be read with `python -m pstats` or e.g. snakeviz.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import json
+import statistics
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any
+
+from ambientika_py import Device
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.util import dt as dt_util
+
+from . import api
+from .api import AmbientikaSession
+from .const import DOMAIN, LOGGER
+from .hub import AmbientikaHub
+
+_HUB_PHASES = {
+    "_async_update_data": "update_data",
+    "_async_update_topology": "fetch_topology",
+    "_async_fetch_statuses": "fetch_statuses",
+    "async_update_listeners": "update_listeners",
+}
+
+# When the response to the last request of the current task was received.
+_received: ContextVar[float] = ContextVar("ambientika_profiling_received")
+
+
+class Profiler:
+    """cProfile and phase timings of all hubs, from `start` to `stop`."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler, it measures once started."""
+        self._hass = hass
+        self._profile = cProfile.Profile()
+        self._spans: defaultdict[str, list[float]] = defaultdict(list)
+        self._restore: list[Callable[[], None]] = []
+        self.started = dt_util.utcnow()
+
+    def start(self, hubs: list[AmbientikaHub]) -> None:
+        """Time the phases of the hubs and their entities, and start cProfile."""
+        self.started = dt_util.utcnow()
+        for hub in hubs:
+            for method, phase in _HUB_PHASES.items():
+                self._wrap(hub, method, phase)
+        for platform in async_get_platforms(self._hass, DOMAIN):
+            for entity in platform.entities.values():
+                self._wrap(entity, "async_write_ha_state", "state_write")
+        self._wrap(api, "parse_response_body", "parse_response")
+        self._time_status_conversion()
+        self._profile.enable()
+
+    def stop(self) -> dict[str, dict[str, float]]:
+        """Stop cProfile, restore the timed methods and return the summary of the phases."""
+        self._profile.disable()
+        for restore in reversed(self._restore):
+            restore()
+        self._restore.clear()
+        return {
+            phase: {
+                "count": len(durations),
+                "total": sum(durations),
+                "mean": statistics.fmean(durations),
+                "p95": _percentile(durations, 95),
+                "max": max(durations),
+            }
+            for phase, durations in self._spans.items()
+            if durations
+        }
+
+    async def async_write(
+        self, summary: dict[str, dict[str, float]]
+    ) -> tuple[str, str]:
+        """Write the cProfile stats and the summary to the config directory, return their paths."""
+        name = f"{DOMAIN}_profile_{self.started.strftime('%Y%m%d_%H%M%S')}"
+        stats_path = self._hass.config.path(f"{name}.prof")
+        summary_path = self._hass.config.path(f"{name}.json")
+        data = {
+            "started": self.started.isoformat(),
+            "stopped": dt_util.utcnow().isoformat(),
+            "phases": summary,
+        }
+
+        def write() -> None:
+            self._profile.dump_stats(stats_path)
+            with open(summary_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+
+        await self._hass.async_add_executor_job(write)
+        LOGGER.info("Wrote the profile to %s and %s", stats_path, summary_path)
+        return stats_path, summary_path
+
+    def _time_status_conversion(self) -> None:
+        """Time converting the data of a status response to a `DeviceStatus`, without fetching it.
+
+        The conversion runs within `Device.status`, from the moment the request returned.
+        """
+        get = AmbientikaSession.get
+        status = Device.status
+        durations = self._spans["parse_status"]
+
+        @functools.wraps(get)
+        async def timed_get(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await get(*args, **kwargs)
+            finally:
+                _received.set(time.perf_counter())
+
+        @functools.wraps(status)
+        async def timed_status(*args: Any, **kwargs: Any) -> Any:
+            result = await status(*args, **kwargs)
+            if (received := _received.get(None)) is not None:
+                durations.append(time.perf_counter() - received)
+            return result
+
+        self._replace(AmbientikaSession, "get", timed_get)
+        self._replace(Device, "status", timed_status)
+
+    def _wrap(self, owner: Any, name: str, phase: str) -> None:
+        """Replace a method by one timing its calls, until `stop` restores it."""
+        method = getattr(owner, name)
+        durations = self._spans[phase]
+
+        if inspect.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def timed(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    durations.append(time.perf_counter() - started)
+
+        else:
+
+            @functools.wraps(method)
+            def timed(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    durations.append(time.perf_counter() - started)
+
+        self._replace(owner, name, timed)
+
+    def _replace(self, owner: Any, name: str, replacement: Any) -> None:
+        """Replace an attribute until `stop` restores it."""
+        method = getattr(owner, name)
+        # Methods of an instance are set on it, hiding the one of the class, and deleted again on restore.
+        shadowed = name in vars(owner)
+        setattr(owner, name, replacement)
+        self._restore.append(
+            functools.partial(setattr, owner, name, method)
+            if shadowed
+            else functools.partial(delattr, owner, name)
+        )
+
+
+def _percentile(durations: list[float], percentile: float) -> float:
+    ordered = sorted(durations)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
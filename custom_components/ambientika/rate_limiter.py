@@ -0,0 +1,115 @@
+"""Rate limiter for the requests sent to an Ambientika host.
+
+The limit applies to a host rather than to an account, so all config entries talking to the same host share
+one limiter. When the host throttles (429) or its gateway fails (502-504), the rate is halved and, if the
+response says so, no request is sent until `Retry-After` has passed. The rate then recovers step by step
+with every successful response.
+"""
+
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DATA_RATE_LIMITERS,
+    DEFAULT_RATE_LIMIT,
+    LOGGER,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MIN_FACTOR,
+    RATE_LIMIT_RECOVERY_STEP,
+    RETRY_AFTER_MAX,
+    THROTTLING_STATUSES,
+)
+
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistant, host: str) -> RateLimiter:
+    """Return the limiter shared by all entries talking to the host."""
+    limiters: dict[str, RateLimiter] = hass.data.setdefault(DATA_RATE_LIMITERS, {})
+    if (limiter := limiters.get(host)) is None:
+        limiter = limiters[host] = RateLimiter(DEFAULT_RATE_LIMIT, RATE_LIMIT_BURST)
+    return limiter
+
+
+class RateLimiter:
+    """Token bucket whose rate adapts to throttling responses."""
+
+    def __init__(self, max_rate: float, burst: int) -> None:
+        """Initialize the limiter, the rates are in requests per second."""
+        self._default_rate = max_rate
+        self._limits: dict[str, float] = {}
+        self.max_rate = max_rate
+        self.rate = max_rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+
+    @property
+    def throttled(self) -> bool:
+        """Return whether the rate is lowered because the API throttled."""
+        return self.rate < self.max_rate or time.monotonic() < self._blocked_until
+
+    def set_limit(self, owner: str, max_rate: float) -> None:
+        """Set the rate configured by an entry, the lowest of all entries applies."""
+        self._limits[owner] = max_rate
+        self._apply_limits()
+
+    def remove_limit(self, owner: str) -> None:
+        """Remove the rate configured by an entry, e.g. on unload."""
+        self._limits.pop(owner, None)
+        self._apply_limits()
+
+    def _apply_limits(self) -> None:
+        """Apply the lowest configured rate, a throttled rate is kept if it is lower."""
+        self.max_rate = min(self._limits.values(), default=self._default_rate)
+        self.rate = min(self.rate, self.max_rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available."""
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._blocked_until or self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def delay(self) -> float:
+        """Return the seconds until a token may be available."""
+        now = time.monotonic()
+        self._refill(now)
+        return max(self._blocked_until - now, (1 - self._tokens) / self.rate, 0)
+
+    def record(self, status: int, retry_after: float | None = None) -> None:
+        """Adapt the rate to the status of a response."""
+        if status in THROTTLING_STATUSES:
+            if self.rate == self.max_rate:
+                LOGGER.warning(
+                    "Ambientika API is throttling requests (%s), slowing down.", status
+                )
+            self.rate = max(self.max_rate * RATE_LIMIT_MIN_FACTOR, self.rate / 2)
+            if retry_after:
+                self._blocked_until = max(
+                    self._blocked_until,
+                    time.monotonic() + min(retry_after, RETRY_AFTER_MAX),
+                )
+            LOGGER.debug(
+                "Rate limited to %.2f requests/s, retry after %ss.",
+                self.rate,
+                retry_after,
+            )
+        elif self.rate < self.max_rate:
+            self.rate = min(
+                self.max_rate, self.rate + self.max_rate * RATE_LIMIT_RECOVERY_STEP
+            )
+            if self.rate == self.max_rate:
+                LOGGER.info("Ambientika API is no longer throttling requests.")
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate
+        )
+        self._refilled_at = now
@@ -0,0 +1,160 @@
+"""Scheduling of the requests sent to the Ambientika API.
+
+All requests share a limited number of slots and a rate limiter, see `RateLimiter`. When requests have to
+wait, the ones a user is waiting for go first: a command to a device is sent before the status requests of a
+large refresh that were queued earlier, so it takes about one round trip regardless of the polling.
+The priority is taken from the context of the caller, see `use_priority`.
+
+Like the rate limiter, the scheduler is shared by all entries talking to the same host, so a command of one
+account also goes before the polling of another one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_SCHEDULERS, DEFAULT_MAX_CONCURRENCY, SCHEDULER_RESERVED_SLOTS
+from .rate_limiter import RateLimiter, async_get_rate_limiter
+
+
+class RequestPriority(IntEnum):
+    """Priority of a request, lower values are sent first."""
+
+    COMMAND = 0
+    VERIFY = 1
+    POLL = 2
+    TOPOLOGY = 3
+
+
+_priority: ContextVar[RequestPriority] = ContextVar(
+    "ambientika_request_priority", default=RequestPriority.POLL
+)
+
+
+@contextmanager
+def use_priority(priority: RequestPriority) -> Iterator[None]:
+    """Send the requests made within the block, and the tasks created from it, with the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant, host: str) -> RequestScheduler:
+    """Return the scheduler shared by all entries talking to the host."""
+    schedulers: dict[str, RequestScheduler] = hass.data.setdefault(DATA_SCHEDULERS, {})
+    if (scheduler := schedulers.get(host)) is None:
+        scheduler = schedulers[host] = RequestScheduler(
+            DEFAULT_MAX_CONCURRENCY, async_get_rate_limiter(hass, host)
+        )
+    return scheduler
+
+
+class RequestScheduler:
+    """Hands out slots for requests by priority, limited in number and in rate."""
+
+    def __init__(self, max_concurrency: int, rate_limiter: RateLimiter) -> None:
+        """Initialize the scheduler, `max_concurrency` is the number of requests the polling may have in flight."""
+        self._default_concurrency = max_concurrency
+        self._limits: dict[str, int] = {}
+        self.max_in_flight = max_concurrency + SCHEDULER_RESERVED_SLOTS
+        self.rate_limiter = rate_limiter
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    def set_limit(self, owner: str, max_concurrency: int) -> None:
+        """Set the concurrency configured by an entry, the slots of all entries add up."""
+        self._limits[owner] = max_concurrency
+        self._apply_limits()
+
+    def remove_limit(self, owner: str) -> None:
+        """Remove the concurrency configured by an entry, e.g. on unload."""
+        self._limits.pop(owner, None)
+        self._apply_limits()
+
+    def _apply_limits(self) -> None:
+        """Apply the sum of the configured concurrencies, with the slots reserved for commands on top."""
+        self.max_in_flight = (
+            sum(self._limits.values()) or self._default_concurrency
+        ) + SCHEDULER_RESERVED_SLOTS
+        if self._waiters:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a slot for the priority of the current context, hold it for the block."""
+        await self._async_acquire(_priority.get())
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._dispatch()
+
+    async def _async_acquire(self, priority: RequestPriority) -> None:
+        """Wait until a slot is handed out to this request."""
+        if not self._waiters and self._try_take():
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed out just before the cancellation, pass it on.
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+
+    def _try_take(self) -> bool:
+        """Take a slot if one is free and the rate limiter allows it."""
+        if self.in_flight >= self.max_in_flight or not self.rate_limiter.try_acquire():
+            return False
+        self.in_flight += 1
+        return True
+
+    def _dispatch(self) -> None:
+        """Hand out slots to the waiting requests in order of priority."""
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                # Cancelled while waiting.
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take():
+                break
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+        if (
+            self._waiters
+            and self._timer is None
+            and self.in_flight < self.max_in_flight
+        ):
+            # Held back by the rate limiter, no finishing request would wake up the waiters.
+            self._timer = asyncio.get_running_loop().call_later(
+                self.rate_limiter.delay(), self._on_token
+            )
+
+    def _on_token(self) -> None:
+        """Hand out the slots once a token is available again."""
+        self._timer = None
+        self._dispatch()
@@ -9,16 +9,28 @@ References:
 
 from __future__ import annotations
 
-from ambientika_py import DeviceStatus
-from returns.result import Failure, Success
+from datetime import datetime
+from typing import Any
 
-from homeassistant.core import HomeAssistant
+from ambientika_py import Device
+
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.components.sensor.const import SensorDeviceClass
-
-from .const import DOMAIN, LOGGER, AirQuality, FilterStatus
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
+
+from .const import (
+    DOMAIN,
+    SCHEDULER_SAMPLE_INTERVAL,
+    AirQuality,
+    CircuitState,
+    FilterStatus,
+)
+from .entity import AmbientikaEntity, AmbientikaHubEntity
 from .hub import AmbientikaHub
 
 
@@ -30,69 +42,45 @@ async def async_setup_entry(
 
     # TODO: this could be simplified with ENTITY_DESCTIPTIONS, but requires event subscription
     # https://github.com/DeebotUniverse/Deebot-4-Home-Assistant/blob/dev/custom_components/deebot/sensor.py#L79
-    # async_add_entities((TemperatureSensor(device) for device in hub.devices), True)
-    # async_add_entities((HumiditySensor(device) for device in hub.devices), True)
-    async_add_entities((AirQualitySensor(device) for device in hub.devices), True)
-    async_add_entities((FilterStatusSensor(device) for device in hub.devices), True)
-
-
-class SensorBase(Entity):
+    @callback
+    def async_add_devices(devices: list[Device]) -> None:
+        # async_add_entities(TemperatureSensor(hub, device) for device in devices)
+        # async_add_entities(HumiditySensor(hub, device) for device in devices)
+        async_add_entities(AirQualitySensor(hub, device) for device in devices)
+        async_add_entities(FilterStatusSensor(hub, device) for device in devices)
+
+    entry.async_on_unload(hub.async_add_device_listener(async_add_devices))
+    async_add_entities(
+        [
+            CircuitStateSensor(hub),
+            RequestRateSensor(hub),
+            QueuedRequestsSensor(hub),
+            RequestsPerHourSensor(hub),
+            RequestErrorsSensor(hub),
+            StatusLatencySensor(hub, 50),
+            StatusLatencySensor(hub, 95),
+            LastRefreshDurationSensor(hub),
+            FailedDevicesSensor(hub),
+        ]
+    )
+
+
+class SensorBase(AmbientikaEntity, Entity):
     """Base representation of an Ambientika Sensor."""
 
-    # TODO:
-    # should_poll = False
-
-    def __init__(self, device) -> None:
-        """Initialize the sensor."""
-        self._device = device
-        self._status: DeviceStatus | None = None
-
-    @property
-    def device_info(self):
-        # TODO: move this to a common base class shared with climate.py
-        """Return information to link this entity with the correct device."""
-        return {
-            "identifiers": {(DOMAIN, self._device.serial_number)},
-            "name": self._device.name,
-            "manufacturer": "SUEDWIND",
-            "model": "Ambientika",
-            "serial_number": self._device.serial_number,
-        }
-
-    @property
-    def available(self) -> bool:
-        """Return False if we can't resolve the device's status."""
-        return self._status is not None
-
-    # TODO: move this to a common base class shared with climate.py
-    async def async_update(self) -> None:
-        """Fetch new state data for this device."""
-        LOGGER.debug("Updating sensor entity for device %s", self._device.serial_number)
-        status = await self._device.status()
-        match status:
-            case Success(data):
-                self._status = data
-            case Failure(error):
-                LOGGER.error(
-                    "Could not fetch status for device %s. %s",
-                    self._device.serial_number,
-                    error,
-                )
-                self._status = None
-
 
 class TemperatureSensor(SensorBase):
     """Sensor for the Air Quality status."""
 
-    _attr_has_entity_name = True
     _attr_translation_key = "temperature"
+    _status_fields = ("temperature",)
     # _attr_icon = "mdi:thermometer"
     _attr_device_class = SensorDeviceClass.TEMPERATURE
     _attr_unit_of_measurement = "°C"
 
-    def __init__(self, device):
+    def __init__(self, hub, device):
         """Initialize the sensor."""
-        super().__init__(device)
+        super().__init__(hub, device)
         self._attr_unique_id = f"{self._device.name}_temperature"
 
     @property
@@ -105,15 +93,15 @@ class TemperatureSensor(SensorBase):
 class HumiditySensor(SensorBase):
     """Sensor for the Air Quality status."""
 
-    _attr_has_entity_name = True
     _attr_translation_key = "humidity"
+    _status_fields = ("humidity",)
     # _attr_icon = "mdi:air-purifier"
     _attr_device_class = SensorDeviceClass.HUMIDITY
     _attr_unit_of_measurement = "%"
 
-    def __init__(self, device):
+    def __init__(self, hub, device):
         """Initialize the sensor."""
-        super().__init__(device)
+        super().__init__(hub, device)
         self._attr_unique_id = f"{self._device.name}_humidity"
 
     @property
@@ -126,13 +114,13 @@ class HumiditySensor(SensorBase):
 class AirQualitySensor(SensorBase):
     """Sensor for the Air Quality status."""
 
-    _attr_has_entity_name = True
     _attr_translation_key = "air_quality"
+    _status_fields = ("air_quality",)
     _attr_icon = "mdi:air-purifier"
 
-    def __init__(self, device):
+    def __init__(self, hub, device):
         """Initialize the sensor."""
-        super().__init__(device)
+        super().__init__(hub, device)
         self._attr_unique_id = f"{self._device.name}_air_quality"
 
     @property
@@ -145,14 +133,14 @@ class AirQualitySensor(SensorBase):
 class FilterStatusSensor(SensorBase):
     """Sensor for the Filter Status."""
 
-    _attr_has_entity_name = True
     _attr_translation_key = "filter_status"
+    _status_fields = ("filters_status",)
     _attr_icon = "mdi:air-filter"
     _attr_device_class = SensorDeviceClass.ENUM
 
-    def __init__(self, device):
+    def __init__(self, hub, device):
         """Initialize the sensor."""
-        super().__init__(device)
+        super().__init__(hub, device)
         self._attr_unique_id = f"{self._device.name}_filter_status"
 
     @property
@@ -165,3 +153,193 @@ class FilterStatusSensor(SensorBase):
     def options(self):
         """Return the list of available options."""
         return [name for name, _ in FilterStatus.__members__.items()]
+
+
+class CircuitStateSensor(AmbientikaHubEntity, SensorEntity):
+    """Sensor for the state of the circuit breaker guarding the API."""
+
+    _attr_icon = "mdi:electric-switch"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [state.value for state in CircuitState]
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "circuit_state")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        return self.coordinator.client.circuit_state
+
+
+class SchedulerSensorBase(AmbientikaHubEntity, SensorEntity):
+    """Sensor of the request scheduler, sampled periodically rather than after each refresh.
+
+    The scheduler changes while the requests of a refresh are sent, by the time the refresh has finished
+    the queue is empty again.
+    """
+
+    _sampled: Any = None
+
+    async def async_added_to_hass(self) -> None:
+        """Start sampling."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_time_interval(
+                self.hass,
+                self._async_sample,
+                SCHEDULER_SAMPLE_INTERVAL,
+                name=f"{DOMAIN} {self._attr_translation_key} sample",
+            )
+        )
+
+    @callback
+    def _async_sample(self, _now: datetime) -> None:
+        """Write the state if the value changed since the last sample."""
+        if (value := self.native_value) != self._sampled:
+            self._sampled = value
+            self.async_write_ha_state()
+
+
+class RequestRateSensor(SchedulerSensorBase):
+    """Sensor for the rate requests are limited to, lower than configured while the API throttles."""
+
+    _attr_icon = "mdi:speedometer"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "requests/s"
+    _attr_suggested_display_precision = 1
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "request_rate")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        return self.coordinator.client.rate_limiter.rate
+
+
+class QueuedRequestsSensor(SchedulerSensorBase):
+    """Sensor for the number of requests waiting to be sent."""
+
+    _attr_icon = "mdi:tray-full"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "queued_requests")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        return self.coordinator.client.queued_requests
+
+
+class RequestsPerHourSensor(AmbientikaHubEntity, SensorEntity):
+    """Sensor for the number of requests sent within the last hour."""
+
+    _attr_icon = "mdi:counter"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "requests/h"
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "requests_per_hour")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        return self.coordinator.client.metrics.requests_per_hour
+
+
+class RequestErrorsSensor(AmbientikaHubEntity, SensorEntity):
+    """Sensor for the number of failed requests since the start, by class of error in the attributes."""
+
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "request_errors")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        return self.coordinator.client.metrics.errors.total()
+
+    @property
+    def extra_state_attributes(self):
+        """Return the number of errors by class."""
+        return {
+            str(error): count
+            for error, count in self.coordinator.client.metrics.errors.items()
+        }
+
+
+class StatusLatencySensor(AmbientikaHubEntity, SensorEntity):
+    """Sensor for a percentile of the latency of the last status requests."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+
+    def __init__(self, hub, percentile: int):
+        """Initialize the sensor."""
+        super().__init__(hub, f"status_latency_p{percentile}")
+        self._percentile = percentile
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        latency = self.coordinator.client.metrics.endpoint("status").percentile(
+            self._percentile
+        )
+        if latency is not None:
+            return round(latency * 1000, 1)
+
+
+class LastRefreshDurationSensor(AmbientikaHubEntity, SensorEntity):
+    """Sensor for the time the last refresh took."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_suggested_display_precision = 2
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "last_refresh_duration")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        if (duration := self.coordinator.last_refresh_duration) is not None:
+            return round(duration, 3)
+
+
+class FailedDevicesSensor(AmbientikaHubEntity, SensorEntity):
+    """Sensor for the number of devices whose status could not be fetched by the last refresh."""
+
+    _attr_icon = "mdi:alert-outline"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, hub):
+        """Initialize the sensor."""
+        super().__init__(hub, "failed_devices")
+
+    @property
+    def native_value(self):
+        """State of the sensor."""
+        return len(self.coordinator.failed_devices)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the reason of the failure by device name."""
+        names = {
+            device.serial_number: device.name for device in self.coordinator.devices
+        }
+        return {
+            names.get(serial_number, serial_number): reason
+            for serial_number, reason in self.coordinator.failed_devices.items()
+        }
@@ -0,0 +1,185 @@
+"""Services controlling all devices of a house or room at once, and profiling the integration."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from ambientika_py import Device, FanSpeed, HumidityLevel, OperatingMode
+
+from .api import AmbientikaApiClientError
+from .const import (
+    ATTR_HOUSE,
+    ATTR_ROOM,
+    DATA_PROFILER,
+    DOMAIN,
+    MODE_FIELDS,
+    SERVICE_REFRESH_TOPOLOGY,
+    SERVICE_SET_MODE,
+    SERVICE_SET_ROOM_MODE,
+    SERVICE_START_PROFILING,
+    SERVICE_STOP_PROFILING,
+)
+from .hub import AmbientikaHub
+from .profiling import Profiler
+
+MODE_ENUMS = {
+    "operating_mode": OperatingMode,
+    "fan_speed": FanSpeed,
+    "humidity_level": HumidityLevel,
+}
+
+MODE_SCHEMA = {
+    vol.Optional(field): vol.In(list(enum.__members__))
+    for field, enum in MODE_ENUMS.items()
+}
+SET_MODE_SCHEMA = vol.All(
+    vol.Schema({vol.Required(ATTR_HOUSE): cv.string, **MODE_SCHEMA}),
+    cv.has_at_least_one_key(*MODE_FIELDS),
+)
+SET_ROOM_MODE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_ROOM): cv.string,
+            vol.Optional(ATTR_HOUSE): cv.string,
+            **MODE_SCHEMA,
+        }
+    ),
+    cv.has_at_least_one_key(*MODE_FIELDS),
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_set_mode(call: ServiceCall) -> ServiceResponse:
+        """Change the mode of all devices of a house."""
+        targets = [
+            (hub, [device for room in house.rooms for device in room.devices])
+            for hub in _hubs(hass)
+            for house in hub.houses
+            if _matches(house, call.data[ATTR_HOUSE])
+        ]
+        if not targets:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="house_not_found",
+                translation_placeholders={"house": call.data[ATTR_HOUSE]},
+            )
+        return await _async_change_mode(targets, _changes(call))
+
+    async def async_set_room_mode(call: ServiceCall) -> ServiceResponse:
+        """Change the mode of all devices of a room."""
+        targets = [
+            (hub, room.devices)
+            for hub in _hubs(hass)
+            for house in hub.houses
+            if ATTR_HOUSE not in call.data or _matches(house, call.data[ATTR_HOUSE])
+            for room in house.rooms
+            if _matches(room, call.data[ATTR_ROOM])
+        ]
+        if not targets:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="room_not_found",
+                translation_placeholders={"room": call.data[ATTR_ROOM]},
+            )
+        return await _async_change_mode(targets, _changes(call))
+
+    async def async_refresh_topology(call: ServiceCall) -> None:
+        """Fetch the houses, rooms and devices of all accounts now."""
+        try:
+            await asyncio.gather(*(hub.async_refresh_topology() for hub in _hubs(hass)))
+        except AmbientikaApiClientError as exception:
+            raise HomeAssistantError(
+                translation_domain=DOMAIN,
+                translation_key="topology_failed",
+                translation_placeholders={"error": str(exception)},
+            ) from exception
+
+    async def async_start_profiling(call: ServiceCall) -> None:
+        """Start profiling the refreshes of all accounts."""
+        if DATA_PROFILER in hass.data:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="profiling_running"
+            )
+        profiler = hass.data[DATA_PROFILER] = Profiler(hass)
+        profiler.start(_hubs(hass))
+
+    async def async_stop_profiling(call: ServiceCall) -> ServiceResponse:
+        """Stop profiling, write the profile and return the summary of the phases."""
+        if (profiler := hass.data.pop(DATA_PROFILER, None)) is None:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN, translation_key="profiling_not_running"
+            )
+        summary = profiler.stop()
+        stats_path, summary_path = await profiler.async_write(summary)
+        return {"stats": stats_path, "summary": summary_path, "phases": summary}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_MODE,
+        async_set_mode,
+        schema=SET_MODE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_ROOM_MODE,
+        async_set_room_mode,
+        schema=SET_ROOM_MODE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH_TOPOLOGY, async_refresh_topology
+    )
+    hass.services.async_register(DOMAIN, SERVICE_START_PROFILING, async_start_profiling)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_PROFILING,
+        async_stop_profiling,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def _hubs(hass: HomeAssistant) -> list[AmbientikaHub]:
+    """Return the hubs of all loaded entries."""
+    return list(hass.data.get(DOMAIN, {}).values())
+
+
+def _matches(group: Any, value: str) -> bool:
+    """Return whether a house or room is referred to by its id or name."""
+    return value == str(group.id) or value.casefold() == group.name.casefold()
+
+
+def _changes(call: ServiceCall) -> dict[str, Any]:
+    """Return the mode fields set in the service call."""
+    return {
+        field: MODE_ENUMS[field][call.data[field]]
+        for field in MODE_FIELDS
+        if field in call.data
+    }
+
+
+async def _async_change_mode(
+    targets: list[tuple[AmbientikaHub, list[Device]]], changes: dict[str, Any]
+) -> ServiceResponse:
+    """Send the changes to all targeted devices concurrently and return the outcome per device."""
+    results = await asyncio.gather(
+        *(hub.async_change_group_mode(devices, changes) for hub, devices in targets)
+    )
+    devices: dict[str, Any] = {}
+    for result in results:
+        devices.update(result)
+    return {"devices": devices}
@@ -0,0 +1,91 @@
+"""Cache of the houses, rooms and devices of an account.
+
+Fetching the topology takes several requests to the cloud. It is kept on disk so the entities can be set up
+right away on the next start, even when the cloud is not reachable, and reconciled once it answers again.
+The houses are stored in the format of the API, so they can be rebuilt by ambientika_py.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from ambientika_py import Device, House, Room
+
+from .const import DOMAIN, TOPOLOGY_SAVE_DELAY, TOPOLOGY_STORAGE_VERSION
+
+
+class TopologyCache:
+    """Stores the houses of a config entry across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the cache."""
+        self._store = Store[list[dict[str, Any]]](
+            hass, TOPOLOGY_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.topology"
+        )
+        self._saved: list[dict[str, Any]] | None = None
+
+    @property
+    def data(self) -> list[dict[str, Any]] | None:
+        """Return the houses last loaded or stored, in the format of the API."""
+        return self._saved
+
+    async def async_load(self) -> list[dict[str, Any]] | None:
+        """Return the houses stored by the last run, in the format of the API."""
+        self._saved = await self._store.async_load()
+        return self._saved
+
+    def async_save(self, houses: list[House]) -> None:
+        """Store the houses if they changed since they were last stored."""
+        data = [_house_data(house) for house in houses]
+        if data != self._saved:
+            self._saved = data
+            self._store.async_delay_save(lambda: data, TOPOLOGY_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored houses, e.g. when the entry is removed."""
+        await self._store.async_remove()
+
+
+def _house_data(house: House) -> dict[str, Any]:
+    """Return a house in the format of the API."""
+    return {
+        "userId": house.user_id,
+        "id": house.id,
+        "name": house.name,
+        "zones": house.zones,
+        "rooms": [_room_data(room) for room in house.rooms],
+        "hasZones": house.has_zones,
+        "hasDevices": house.has_devices,
+        "address": house.address,
+        "latitude": house.latitude,
+        "longitude": house.longitude,
+    }
+
+
+def _room_data(room: Room) -> dict[str, Any]:
+    """Return a room in the format of the API."""
+    return {
+        "id": room.id,
+        "name": room.name,
+        "houseId": room.house_id,
+        "userId": room.user_id,
+        "devices": [_device_data(device) for device in room.devices],
+    }
+
+
+def _device_data(device: Device) -> dict[str, Any]:
+    """Return a device in the format of the API."""
+    return {
+        "id": device.id,
+        "deviceType": device.device_type,
+        "serialNumber": device.serial_number,
+        "userId": device.user_id,
+        "name": device.name,
+        "role": device.role,
+        "zoneIndex": device.zone_index,
+        "installation": device.installation,
+        "roomId": device.room_id,
+    }
@@ -0,0 +1,333 @@
+"""Benchmark of a refresh cycle of the integration against the simulator, by number of devices.
+
+For every size a fresh Home Assistant instance sets up the integration with all its platforms against
+`scripts/ambientika_simulator.py`, then runs a few refresh cycles. The simulator runs in its own process,
+so its work is not counted. Reported per size, as JSON:
+
+- `cycle_seconds`: wall-clock time of a refresh cycle, until all state writes are done.
+- `requests_per_cycle`: requests received by the simulator during a cycle.
+- `loop_blocked_ms` / `loop_lag_max_ms`: time the event loop was late to wake up a 10 ms ticker during a
+  cycle, summed and at worst. This is the time the loop was blocked by synchronous work.
+- `state_writes_per_cycle`: `state_changed` and `state_reported` events of the integration's entities.
+- `peak_memory_bytes`: peak of the memory traced by tracemalloc during the setup and the first refresh.
+  Tracing is stopped before the timed cycles, as it slows them down.
+
+Cycles are spaced by the request cache TTL, so every cycle fetches all statuses.
+
+Usage: scripts/benchmark --sizes 1 10 50 100 250 500 --cycles 3 --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from homeassistant import core, loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
+from homeassistant.helpers import (
+    area_registry,
+    category_registry,
+    device_registry,
+    entity_registry,
+    floor_registry,
+    issue_registry,
+    label_registry,
+)
+from homeassistant.setup import async_setup_component
+
+DOMAIN = "ambientika"
+INTEGRATION_PATH = Path(__file__).parent.parent / "custom_components" / DOMAIN
+SIMULATOR_PATH = Path(__file__).parent / "ambientika_simulator.py"
+TICK = 0.01
+# Devices per simulated room.
+ROOM_SIZE = 5
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a periodic ticker."""
+
+    def __init__(self) -> None:
+        """Initialize the monitor, it measures once started."""
+        self.blocked = 0.0
+        self.max_lag = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Reset the measurements and start ticking."""
+        self.blocked = self.max_lag = 0.0
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        """Stop ticking."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag = max(0.0, time.perf_counter() - before - TICK)
+            self.blocked += lag
+            self.max_lag = max(self.max_lag, lag)
+
+
+class SimulatorProcess:
+    """The simulator, started in a separate process."""
+
+    def __init__(self, port: int, **config: Any) -> None:
+        """Initialize the process, the config are the options of the simulator."""
+        self.url = f"http://127.0.0.1:{port}"
+        self._args = [str(SIMULATOR_PATH), "--port", str(port)]
+        for name, value in config.items():
+            self._args += [f"--{name.replace('_', '-')}", str(value)]
+        self._process: asyncio.subprocess.Process | None = None
+        self._session = aiohttp.ClientSession()
+
+    async def async_start(self) -> None:
+        """Start the simulator and wait until it serves requests."""
+        self._process = await asyncio.create_subprocess_exec(
+            sys.executable, *self._args, stderr=subprocess.DEVNULL
+        )
+        for _ in range(100):
+            try:
+                await self.async_reset_stats()
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.1)
+            else:
+                return
+        raise RuntimeError("The simulator did not start")
+
+    async def async_stats(self) -> dict[str, int]:
+        """Return the number of requests by endpoint since the last reset."""
+        async with self._session.get(f"{self.url}/_simulator/stats") as response:
+            return await response.json()
+
+    async def async_reset_stats(self) -> None:
+        """Reset the counters of the requests."""
+        async with self._session.post(f"{self.url}/_simulator/stats") as response:
+            response.raise_for_status()
+
+    async def async_stop(self) -> None:
+        """Stop the simulator."""
+        await self._session.close()
+        if self._process is not None:
+            self._process.terminate()
+            await self._process.wait()
+
+
+async def _async_make_hass(config_dir: Path) -> core.HomeAssistant:
+    """Start a bare Home Assistant instance with the integration as custom component."""
+    custom_components = config_dir / "custom_components"
+    custom_components.mkdir(parents=True)
+    (custom_components / DOMAIN).symlink_to(INTEGRATION_PATH.resolve())
+
+    hass = core.HomeAssistant(str(config_dir))
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    await asyncio.gather(
+        area_registry.async_load(hass),
+        category_registry.async_load(hass),
+        device_registry.async_load(hass),
+        entity_registry.async_load(hass),
+        floor_registry.async_load(hass),
+        issue_registry.async_load(hass),
+        label_registry.async_load(hass),
+    )
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.set_state(core.CoreState.running)
+    await async_setup_component(hass, "homeassistant", {})
+    return hass
+
+
+def _make_entry(host: str, options: dict[str, Any]) -> ConfigEntry:
+    return ConfigEntry(
+        data={CONF_USERNAME: "benchmark", CONF_PASSWORD: "benchmark", CONF_HOST: host},
+        discovery_keys={},
+        domain=DOMAIN,
+        minor_version=1,
+        options=options,
+        source="user",
+        title="benchmark",
+        unique_id=None,
+        version=1,
+    )
+
+
+async def async_benchmark_size(
+    devices: int,
+    cycles: int,
+    port: int,
+    latency: float,
+    options: dict[str, Any],
+    config_dir: Path,
+) -> dict[str, Any]:
+    """Set up the integration with the given number of devices and measure its refresh cycles."""
+    room_size = min(devices, ROOM_SIZE)
+    simulator = SimulatorProcess(
+        port,
+        houses=1,
+        rooms=math.ceil(devices / room_size),
+        devices=room_size,
+        latency=latency,
+        change_rate=0.1,
+        seed=devices,
+    )
+    await simulator.async_start()
+    hass = await _async_make_hass(config_dir)
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        entry = _make_entry(simulator.url, options)
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        setup_seconds = time.perf_counter() - started
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        hub = hass.data[DOMAIN][entry.entry_id]
+        const = sys.modules[f"custom_components.{DOMAIN}.const"]
+        entity_ids = {
+            entity.entity_id
+            for entity in entity_registry.async_entries_for_config_entry(
+                entity_registry.async_get(hass), entry.entry_id
+            )
+        }
+        writes = 0
+
+        @core.callback
+        def count_write(event: core.Event) -> None:
+            nonlocal writes
+            writes += 1
+
+        @core.callback
+        def is_own_entity(event_data: dict[str, Any]) -> bool:
+            return event_data["entity_id"] in entity_ids
+
+        for event_type in ("state_changed", "state_reported"):
+            hass.bus.async_listen(event_type, count_write, event_filter=is_own_entity)
+
+        monitor = LoopLagMonitor()
+        results = []
+        for _ in range(cycles):
+            # Let the cached results of the previous cycle expire.
+            await asyncio.sleep(const.REQUEST_CACHE_TTL + 0.1)
+            await hass.async_block_till_done()
+            await simulator.async_reset_stats()
+            writes = 0
+            monitor.start()
+            started = time.perf_counter()
+            await hub.async_refresh()
+            await hass.async_block_till_done()
+            elapsed = time.perf_counter() - started
+            monitor.stop()
+            stats = await simulator.async_stats()
+            results.append(
+                {
+                    "cycle_seconds": elapsed,
+                    "requests": sum(
+                        count for key, count in stats.items() if key.startswith("/")
+                    ),
+                    "state_writes": writes,
+                    "loop_blocked_ms": monitor.blocked * 1000,
+                    "loop_lag_max_ms": monitor.max_lag * 1000,
+                }
+            )
+
+        return {
+            "devices": len(hub.devices),
+            "entities": len(entity_ids),
+            "setup_seconds": round(setup_seconds, 4),
+            "cycle_seconds": _summary([result["cycle_seconds"] for result in results]),
+            "requests_per_cycle": _summary([result["requests"] for result in results]),
+            "state_writes_per_cycle": _summary(
+                [result["state_writes"] for result in results]
+            ),
+            "loop_blocked_ms": _summary(
+                [result["loop_blocked_ms"] for result in results]
+            ),
+            "loop_lag_max_ms": round(
+                max(result["loop_lag_max_ms"] for result in results), 4
+            ),
+            "peak_memory_bytes": peak_memory,
+            "refresh_succeeded": hub.last_update_success,
+        }
+    finally:
+        await hass.async_stop()
+        await simulator.async_stop()
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    return {
+        "mean": round(statistics.fmean(values), 4),
+        "min": round(min(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1, 10, 50, 100, 250, 500]
+    )
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--port", type=int, default=4522)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--rate-limit", type=int, default=100)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    # The scheduled refreshes must not interfere with the measured ones.
+    options = {
+        "scan_interval": 3600,
+        "max_concurrency": args.max_concurrency,
+        "rate_limit": args.rate_limit,
+    }
+    report = {
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "latency": args.latency,
+        "options": options,
+        "results": [],
+    }
+    # The config directories are removed at the end only, `custom_components` stays imported from the first.
+    with tempfile.TemporaryDirectory(prefix="ambientika-benchmark-") as root:
+        for index, size in enumerate(args.sizes):
+            result = await async_benchmark_size(
+                size,
+                args.cycles,
+                args.port,
+                args.latency,
+                options,
+                Path(root) / str(index),
+            )
+            logging.getLogger(__name__).info("%s", result)
+            report["results"].append(result)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_main())
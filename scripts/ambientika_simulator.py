@@ -0,0 +1,391 @@
+"""Local stand-in for the Ambientika cloud API.
+
+Serves the endpoints used by ambientika_py and documented in requests.http for a configurable number of
+houses, rooms and devices, so the integration can be run and load tested without the vendor cloud. Paths
+are matched case-insensitively, like the real API does.
+
+Faults can be injected: latency, server errors, rejected tokens (401), throttling (429) and expiring tokens.
+Counters of the handled requests are served at `/_simulator/stats`, and reset with a POST to it.
+
+Point the integration at it with the host of the config flow (advanced mode), e.g. `http://127.0.0.1:4521`.
+
+Usage: scripts/simulate --houses 1 --rooms 5 --devices 10 --latency 0.2 --error-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import logging
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+LOGGER = logging.getLogger("ambientika_simulator")
+
+OPERATING_MODES = [
+    "Smart",
+    "Auto",
+    "ManualHeatRecovery",
+    "Night",
+    "AwayHome",
+    "Surveillance",
+    "TimedExpulsion",
+    "Expulsion",
+    "Intake",
+    "MasterSlaveFlow",
+    "SlaveMasterFlow",
+    "Off",
+]
+FAN_SPEEDS = ["Low", "Medium", "High"]
+HUMIDITY_LEVELS = ["Dry", "Normal", "Moist"]
+AIR_QUALITIES = ["VeryGood", "Good", "Medium", "Poor", "Bad"]
+
+
+@dataclass
+class SimulatorConfig:
+    """Size of the simulated account and the faults to inject."""
+
+    houses: int = 1
+    rooms: int = 2
+    # Devices per room.
+    devices: int = 2
+    # Seconds added to every response, and the random part added on top of it.
+    latency: float = 0.05
+    jitter: float = 0.0
+    # Probabilities of a request failing with a 500, 401 or 429.
+    error_rate: float = 0.0
+    unauthorized_rate: float = 0.0
+    throttle_rate: float = 0.0
+    # Seconds sent in the `Retry-After` header of a 429, none if 0.
+    retry_after: int = 1
+    # Requests per second above which requests are throttled, no limit if 0.
+    max_rate: float = 0.0
+    # Seconds a token is valid.
+    token_lifetime: int = 3600
+    # Probability of the readings of a device changing between two status requests.
+    change_rate: float = 0.0
+    seed: int | None = None
+
+
+@dataclass
+class SimulatedDevice:
+    """A device and its current status."""
+
+    id: int
+    serial_number: str
+    name: str
+    room_id: int
+    role: str
+    status: dict[str, Any] = field(default_factory=dict)
+
+
+class AmbientikaSimulator:
+    """In-memory Ambientika account served over HTTP."""
+
+    def __init__(self, config: SimulatorConfig) -> None:
+        """Create the houses, rooms and devices of the account."""
+        self.config = config
+        self.random = random.Random(config.seed)
+        self.stats: Counter[str] = Counter()
+        self._tokens: dict[str, float] = {}
+        self._window: list[float] = []
+        self.houses: list[dict[str, Any]] = []
+        self.devices: dict[str, SimulatedDevice] = {}
+
+        device_id = 0
+        for house_index in range(config.houses):
+            house_id = house_index + 1
+            rooms = []
+            for room_index in range(config.rooms):
+                room_id = house_id * 1000 + room_index + 1
+                for device_index in range(config.devices):
+                    device_id += 1
+                    serial_number = f"SIM{device_id:06d}"
+                    self.devices[serial_number] = SimulatedDevice(
+                        id=device_id,
+                        serial_number=serial_number,
+                        name=f"Device {house_id}.{room_index + 1}.{device_index + 1}",
+                        room_id=room_id,
+                        role="Master" if device_index == 0 else "SlaveEqualMaster",
+                        status=self._initial_status(serial_number, device_index),
+                    )
+                rooms.append({"id": room_id, "name": f"Room {room_index + 1}"})
+            self.houses.append(
+                {"id": house_id, "name": f"House {house_id}", "rooms": rooms}
+            )
+
+        self._routes = {
+            ("POST", "/users/authenticate"): self._authenticate,
+            ("GET", "/house/houses"): self._houses,
+            ("GET", "/house/houses-info"): self._houses_info,
+            ("GET", "/house/house-devices"): self._house_devices,
+            ("GET", "/house/house-complete-info"): self._house_complete_info,
+            ("GET", "/device/device-status"): self._device_status,
+            ("GET", "/device/reset-filter"): self._reset_filter,
+            ("POST", "/device/change-mode"): self._change_mode,
+        }
+
+    def app(self) -> web.Application:
+        """Return the web application serving the API."""
+        app = web.Application()
+        app.router.add_route("*", "/_simulator/stats", self._stats)
+        app.router.add_route("*", "/{path:.*}", self._dispatch)
+        return app
+
+    def _initial_status(self, serial_number: str, index: int) -> dict[str, Any]:
+        return {
+            "operatingMode": "Auto",
+            "fanSpeed": "Low",
+            "humidityLevel": "Normal",
+            "temperature": 20 + index % 5,
+            "humidity": 45 + index % 10,
+            "airQuality": "Good",
+            "humidityAlarm": False,
+            "filtersStatus": "Good",
+            "nightAlarm": False,
+            "deviceRole": "Master" if index == 0 else "SlaveEqualMaster",
+            "lastOperatingMode": "Auto",
+            "packetType": "DeviceStatus",
+            "deviceType": "Ambientika",
+            "deviceSerialNumber": serial_number,
+        }
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        """Route the request by its lower cased path and inject the configured faults."""
+        path = request.path.lower().rstrip("/")
+        if (handler := self._routes.get((request.method, path))) is None:
+            self.stats["not_found"] += 1
+            return web.json_response({"message": "Not found"}, status=404)
+
+        self.stats[path] += 1
+        config = self.config
+        if config.latency or config.jitter:
+            await asyncio.sleep(config.latency + self.random.random() * config.jitter)
+
+        if path != "/users/authenticate" and (
+            not self._token_valid(request)
+            or self.random.random() < config.unauthorized_rate
+        ):
+            self.stats["unauthorized"] += 1
+            return web.json_response({"message": "Unauthorized"}, status=401)
+
+        if self._over_rate() or self.random.random() < config.throttle_rate:
+            self.stats["throttled"] += 1
+            headers = (
+                {"Retry-After": str(config.retry_after)} if config.retry_after else {}
+            )
+            return web.json_response(
+                {"message": "Too many requests"}, status=429, headers=headers
+            )
+        if self.random.random() < config.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"message": "Internal server error"}, status=500)
+
+        return await handler(request)
+
+    def _token_valid(self, request: web.Request) -> bool:
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        return self._tokens.get(token, 0) > time.time()
+
+    def _over_rate(self) -> bool:
+        """Return whether the requests of the last second exceed the configured rate."""
+        if not self.config.max_rate:
+            return False
+        now = time.monotonic()
+        self._window = [sent for sent in self._window if now - sent < 1]
+        self._window.append(now)
+        return len(self._window) > self.config.max_rate
+
+    def _device(self, request: web.Request) -> SimulatedDevice | None:
+        serial_number = request.query.get("deviceSerialNumber", "")
+        return self.devices.get(serial_number)
+
+    def _device_data(self, device: SimulatedDevice, house_id: int) -> dict[str, Any]:
+        return {
+            "id": device.id,
+            "deviceType": "Ambientika",
+            "serialNumber": device.serial_number,
+            "userId": 1,
+            "name": device.name,
+            "role": device.role,
+            "zoneIndex": 0,
+            "installation": "Wall",
+            "roomId": device.room_id,
+            "houseId": house_id,
+        }
+
+    def _house(self, request: web.Request) -> dict[str, Any] | None:
+        house_id = request.query.get("houseId", "")
+        return next(
+            (house for house in self.houses if str(house["id"]) == house_id), None
+        )
+
+    async def _authenticate(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not body.get("username") or not body.get("password"):
+            return web.json_response({"message": "Invalid credentials"}, status=400)
+
+        expires_at = time.time() + self.config.token_lifetime
+        claims = json.dumps({"exp": int(expires_at)}).encode()
+        payload = base64.urlsafe_b64encode(claims).decode().rstrip("=")
+        token = f"e30.{payload}.{uuid.uuid4().hex}"
+        self._tokens[token] = expires_at
+        return web.json_response(
+            {"id": 1, "username": body["username"], "jwtToken": token}
+        )
+
+    async def _houses(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [{"id": house["id"], "name": house["name"]} for house in self.houses]
+        )
+
+    async def _houses_info(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [{"houseId": house["id"], "name": house["name"]} for house in self.houses]
+        )
+
+    async def _house_devices(self, request: web.Request) -> web.Response:
+        if (house := self._house(request)) is None:
+            return web.json_response({"message": "House not found"}, status=404)
+        return web.json_response(
+            [
+                self._device_data(device, house["id"])
+                for room in house["rooms"]
+                for device in self.devices.values()
+                if device.room_id == room["id"]
+            ]
+        )
+
+    async def _house_complete_info(self, request: web.Request) -> web.Response:
+        if (house := self._house(request)) is None:
+            return web.json_response({"message": "House not found"}, status=404)
+        rooms = [
+            {
+                "id": room["id"],
+                "name": room["name"],
+                "houseId": house["id"],
+                "userId": 1,
+                "devices": [
+                    self._device_data(device, house["id"])
+                    for device in self.devices.values()
+                    if device.room_id == room["id"]
+                ],
+            }
+            for room in house["rooms"]
+        ]
+        return web.json_response(
+            {
+                "userId": 1,
+                "id": house["id"],
+                "name": house["name"],
+                "zones": [],
+                "rooms": rooms,
+                "hasZones": False,
+                "hasDevices": bool(self.devices),
+                "address": "",
+                "latitude": 0,
+                "longitude": 0,
+            }
+        )
+
+    async def _device_status(self, request: web.Request) -> web.Response:
+        if (device := self._device(request)) is None:
+            return web.json_response({"message": "Device not found"}, status=404)
+        if self.random.random() < self.config.change_rate:
+            status = device.status
+            status["temperature"] = max(
+                10, min(35, status["temperature"] + self.random.choice((-1, 1)))
+            )
+            status["humidity"] = max(
+                20, min(90, status["humidity"] + self.random.choice((-1, 1)))
+            )
+            status["airQuality"] = self.random.choice(AIR_QUALITIES)
+        return web.json_response(device.status)
+
+    async def _reset_filter(self, request: web.Request) -> web.Response:
+        if (device := self._device(request)) is None:
+            return web.json_response({"message": "Device not found"}, status=404)
+        device.status["filtersStatus"] = "Good"
+        return web.Response(status=200)
+
+    async def _change_mode(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        device = self.devices.get(body.get("deviceSerialNumber", ""))
+        if device is None:
+            return web.json_response({"message": "Device not found"}, status=404)
+        try:
+            operating_mode = OPERATING_MODES[int(body["operatingMode"])]
+            fan_speed = FAN_SPEEDS[int(body["fanSpeed"])]
+            humidity_level = HUMIDITY_LEVELS[int(body["humidityLevel"])]
+        except (KeyError, IndexError, ValueError):
+            return web.json_response({"message": "Invalid mode"}, status=400)
+
+        status = device.status
+        if status["operatingMode"] != operating_mode:
+            status["lastOperatingMode"] = status["operatingMode"]
+        status.update(
+            operatingMode=operating_mode,
+            fanSpeed=fan_speed,
+            humidityLevel=humidity_level,
+        )
+        return web.Response(status=200)
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        if request.method == "POST":
+            self.stats.clear()
+        return web.json_response(dict(self.stats))
+
+
+async def async_start(
+    simulator: AmbientikaSimulator, host: str = "127.0.0.1", port: int = 4521
+) -> web.AppRunner:
+    """Serve the simulator until the returned runner is cleaned up."""
+    runner = web.AppRunner(simulator.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def _parse_args() -> tuple[SimulatorConfig, str, int]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4521)
+    defaults = SimulatorConfig()
+    for name, value in vars(defaults).items():
+        kind = int if name == "seed" else type(value)
+        parser.add_argument(f"--{name.replace('_', '-')}", type=kind, default=value)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    return SimulatorConfig(**args), host, port
+
+
+async def _main() -> None:
+    config, host, port = _parse_args()
+    simulator = AmbientikaSimulator(config)
+    runner = await async_start(simulator, host, port)
+    LOGGER.info(
+        "Serving %s houses with %s devices at http://%s:%s",
+        len(simulator.houses),
+        len(simulator.devices),
+        host,
+        port,
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_main())